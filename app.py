@@ -4,28 +4,56 @@ DreamMeridian - Spatial Intelligence Dashboard
 Offline AI-powered spatial queries for humanitarian scenarios
 """
 import streamlit as st
+import streamlit.components.v1 as components
 import folium
-from streamlit_folium import st_folium
-import json
+from folium.plugins import FastMarkerCluster
+import numpy as np
+import orjson
+import os
 import psutil
+import requests
 import subprocess
 import platform
 import re
+import dataclasses
+import functools
+import hashlib
+import string
+import types
 from pathlib import Path
 from datetime import timedelta
 
-# Import query engine
+# Import query engine (hyphenated filename, so spec-load once and reuse the
+# sys.modules entry on Streamlit reruns instead of re-parsing the module)
 import importlib.util
+import sys
 
-spec = importlib.util.spec_from_file_location("dream_meridian", "dream-meridian.py")
-dm = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(dm)
+if "dream_meridian" in sys.modules:
+    dm = sys.modules["dream_meridian"]
+else:
+    spec = importlib.util.spec_from_file_location(
+        "dream_meridian", "dream-meridian.py"
+    )
+    dm = importlib.util.module_from_spec(spec)
+    sys.modules["dream_meridian"] = dm
+    spec.loader.exec_module(dm)
 
 # ============================================================================
 # Configuration
 # ============================================================================
 LLAMA_URL = "http://localhost:8080/v1/chat/completions"
 
+# Keep-alive session for the sidebar's llama-server probes; avoids a fresh
+# TCP handshake on every fragment tick. Behind cache_resource because
+# Streamlit re-executes this script per rerun and would otherwise rebuild
+# the session (and its connection pool) on every widget interaction.
+@st.cache_resource(show_spinner=False)
+def _http_session() -> requests.Session:
+    return requests.Session()
+
+
+_HTTP = _http_session()
+
 CUSTOM_CSS = """
 <style>
 /* Clan Font Family */
@@ -284,9 +312,40 @@ iframe {
 # ============================================================================
 # Hardware Information
 # ============================================================================
-@st.cache_data(ttl=60)
+# Precompiled patterns for Pi model-string cleanup
+_RE_MODEL = re.compile(r" Model ([A-Z])")
+_RE_REV = re.compile(r" Rev [\d.]+")
+
+
+def _open_ro(path: str):
+    """Open a sysfs/procfs file once; pread per tick skips path lookup + open/close."""
+    try:
+        return os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def _monitor_fds() -> tuple:
+    """Open the sysfs/procfs fds once per process.
+
+    Opening at module scope would leak two fds per Streamlit rerun, since the
+    script re-executes but the old fd integers are never closed. Priming
+    psutil's CPU counter lives here too so interval=None deltas stay real.
+    """
+    psutil.cpu_percent(interval=None)
+    return (
+        _open_ro("/sys/class/thermal/thermal_zone0/temp"),
+        _open_ro("/proc/uptime"),
+    )
+
+
+_THERMAL_FD, _UPTIME_FD = _monitor_fds()
+
+
+@st.cache_data(ttl=None, show_spinner=False)
 def get_static_hw_info() -> dict:
-    """Get static hardware info (cached)."""
+    """Get static hardware info (computed once per process)."""
     info = {
         "device": "Unknown",
         "device_short": "Unknown",
@@ -307,8 +366,8 @@ def get_static_hw_info() -> dict:
             model = model_path.read_text().strip().replace("\x00", "")
             info["device"] = model
             short = model.replace("Raspberry Pi ", "Pi ")
-            short = re.sub(r" Model ([A-Z])", r" \1", short)
-            short = re.sub(r" Rev [\d.]+", "", short)
+            short = _RE_MODEL.sub(r" \1", short)
+            short = _RE_REV.sub("", short)
             info["device_short"] = short.strip()
         except:
             pass
@@ -348,37 +407,35 @@ def get_static_hw_info() -> dict:
         info["os_version"] = platform.mac_ver()[0]
     elif Path("/etc/os-release").exists():
         try:
-            for line in Path("/etc/os-release").read_text().split("\n"):
+            for line in Path("/etc/os-release").read_text().splitlines():
                 if line.startswith("ID="):
-                    info["os_name"] = line.split("=")[1].strip('"').title()
+                    info["os_name"] = line.partition("=")[2].strip('"').title()
                 elif line.startswith("VERSION_ID="):
-                    info["os_version"] = line.split("=")[1].strip('"')
+                    info["os_version"] = line.partition("=")[2].strip('"')
         except:
             pass
 
-    # CPU info
+    # CPU info - psutil for the core count (one syscall), cpuinfo only for
+    # the model string, stopping at the first match
+    info["cpu_cores"] = psutil.cpu_count(logical=True) or 0
     if Path("/proc/cpuinfo").exists():
         try:
-            cpuinfo = Path("/proc/cpuinfo").read_text()
-            for line in cpuinfo.split("\n"):
+            for line in Path("/proc/cpuinfo").read_text().splitlines():
                 if line.startswith("model name") or line.startswith("Model"):
-                    info["cpu_model"] = line.split(":")[1].strip()
+                    info["cpu_model"] = line.partition(":")[2].strip()
                     break
-            info["cpu_cores"] = cpuinfo.count("processor\t:")
         except:
             pass
 
-    if not info["cpu_cores"]:
-        info["cpu_cores"] = psutil.cpu_count(logical=True) or 0
-
     info["mem_total_gb"] = psutil.virtual_memory().total / (1024**3)
     info["kernel"] = platform.release()
 
     return info
 
 
+@st.cache_data(ttl=1.0, show_spinner=False)
 def get_dynamic_stats() -> dict:
-    """Get dynamic system stats."""
+    """Get dynamic system stats. Cached for 1s so concurrent readers share one poll."""
     stats = {
         "cpu_temp": None,
         "cpu_percent": 0,
@@ -389,22 +446,14 @@ def get_dynamic_stats() -> dict:
         "uptime": "",
     }
 
-    # Temperature - Pi specific
-    try:
-        result = subprocess.run(
-            ["vcgencmd", "measure_temp"], capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            stats["cpu_temp"] = float(result.stdout.split("=")[1].replace("'C", ""))
-    except:
+    # Temperature - pread the persistent sysfs fd; no fork, no open/close
+    if _THERMAL_FD is not None:
         try:
-            temp = Path("/sys/class/thermal/thermal_zone0/temp")
-            if temp.exists():
-                stats["cpu_temp"] = int(temp.read_text().strip()) / 1000
+            stats["cpu_temp"] = int(os.pread(_THERMAL_FD, 16, 0)) / 1000
         except:
             pass
 
-    stats["cpu_percent"] = psutil.cpu_percent(interval=0.1)
+    stats["cpu_percent"] = psutil.cpu_percent(interval=None)
     try:
         freq = psutil.cpu_freq()
         if freq:
@@ -423,8 +472,8 @@ def get_dynamic_stats() -> dict:
 
     # Uptime
     try:
-        if Path("/proc/uptime").exists():
-            uptime_sec = float(Path("/proc/uptime").read_text().split()[0])
+        if _UPTIME_FD is not None:
+            uptime_sec = float(os.pread(_UPTIME_FD, 64, 0).split()[0])
         else:
             # macOS fallback
             result = subprocess.run(
@@ -458,73 +507,209 @@ def get_dynamic_stats() -> dict:
     return stats
 
 
-def get_llm_status() -> dict:
-    """Check LLM server status."""
-    import requests
+@st.cache_data(ttl=5, show_spinner=False)
+def _llm_health() -> bool:
+    """Short-TTL health probe so the fragment doesn't hit the server every tick."""
+    try:
+        health = _HTTP.get(
+            LLAMA_URL.replace("/v1/chat/completions", "/health"), timeout=0.25
+        )
+        return health.status_code == 200
+    except:
+        return False
 
-    status = {"online": False, "model": None, "backend": "CPU"}
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _llm_props() -> str | None:
+    """Model alias from /props; effectively static, so cached for an hour."""
     try:
-        health = requests.get(
-            LLAMA_URL.replace("/v1/chat/completions", "/health"), timeout=2
+        props = _HTTP.get(
+            LLAMA_URL.replace("/v1/chat/completions", "/props"), timeout=2
         )
-        status["online"] = health.status_code == 200
-
-        try:
-            props = requests.get(
-                LLAMA_URL.replace("/v1/chat/completions", "/props"), timeout=2
-            )
-            if props.status_code == 200:
-                data = props.json()
-                status["model"] = (
-                    data.get("model_alias") or data.get("model", "").split("/")[-1]
-                )
-        except:
-            pass
+        if props.status_code == 200:
+            data = props.json()
+            return data.get("model_alias") or data.get("model", "").split("/")[-1]
     except:
         pass
+    return None
+
 
+def get_llm_status() -> dict:
+    """Check LLM server status."""
+    status = {"online": False, "model": None, "backend": "CPU"}
+    status["online"] = _llm_health()
+    if status["online"]:
+        status["model"] = _llm_props()
     return status
 
 
 # ============================================================================
 # Location Discovery
 # ============================================================================
-def discover_locations() -> dict:
-    """Find all built locations."""
+def _list_configs() -> tuple:
+    """Signature of all location configs as (path, mtime) pairs."""
+    return tuple(
+        sorted(
+            (str(p), p.stat().st_mtime_ns)
+            for p in Path("data").glob("*/config.json")
+        )
+    )
+
+
+@st.cache_data(ttl=None, show_spinner=False)
+def _load_locations(config_sig: tuple) -> dict:
+    """Parse location configs. Only re-runs when a config file changes."""
     locations = {}
-    for config_path in Path("data").glob("*/config.json"):
+    for config_path, _ in config_sig:
         try:
-            with open(config_path) as f:
-                cfg = json.load(f)
-                locations[cfg["slug"]] = {
-                    "name": cfg["name"],
-                    "center": [cfg["center"]["lat"], cfg["center"]["lon"]],
-                    "bounds": cfg["bounds"],
-                    "nodes": cfg.get("nodes", 0),
-                    "pois": cfg.get("pois", 0),
-                    "places": cfg.get("places", 0),
-                    "examples": cfg.get(
-                        "examples",
-                        [
-                            "Find hospitals nearby",
-                            "Schools within 1km",
-                            "15 min walkable area",
-                        ],
-                    ),
-                }
+            cfg = orjson.loads(Path(config_path).read_bytes())
+            locations[cfg["slug"]] = {
+                "name": cfg["name"],
+                "center": [cfg["center"]["lat"], cfg["center"]["lon"]],
+                "bounds": cfg["bounds"],
+                "nodes": cfg.get("nodes", 0),
+                "pois": cfg.get("pois", 0),
+                "places": cfg.get("places", 0),
+                "examples": cfg.get(
+                    "examples",
+                    [
+                        "Find hospitals nearby",
+                        "Schools within 1km",
+                        "15 min walkable area",
+                    ],
+                ),
+            }
         except:
             continue
     return locations
 
 
+def discover_locations() -> dict:
+    """Find all built locations."""
+    return _load_locations(_list_configs())
+
+
+@st.cache_resource(show_spinner=False)
+def load_backend(location_slug: str):
+    """Load spatial backends (graph, DuckDB, places) once per slug per process."""
+    dm.load_location(location_slug)
+    return dm
+
+
+# ============================================================================
+# Query Caching
+# ============================================================================
+class _QueryFailed(Exception):
+    """Raised inside the cached query so failures are never stored."""
+
+    def __init__(self, result):
+        self.result = result
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_query(location_slug: str, norm_query: str, _raw_query: str):
+    """Run a query, keyed on (slug, normalized text) so retypes/re-clicks hit."""
+    result = dm.query(_raw_query, location=location_slug)
+    if not result.success:
+        # st.cache_data does not store raised calls, so a transient LLM or
+        # tool error is retried on the next click instead of being replayed
+        raise _QueryFailed(result)
+    return result
+
+
+def run_query(location_slug: str, user_query: str):
+    """Query with an LRU: identical queries skip the LLM round trip."""
+    norm_query = " ".join(user_query.lower().split())
+    key = (location_slug, norm_query)
+    seen = st.session_state.setdefault("_query_keys", set())
+    try:
+        result = _cached_query(location_slug, norm_query, user_query)
+    except _QueryFailed as e:
+        return e.result
+    result.cached = key in seen
+    seen.add(key)
+    return result
+
+
 # ============================================================================
 # UI Components
 # ============================================================================
-@st.fragment(run_every="1s")
+# Static header badge row emitted on every rerun of main(); built once
+_STATIC_BANNER_HTML = """
+<div class="info-row" style="justify-content: flex-end; margin-top: 0.5rem;">
+    <span>🧠 xLAM-2-1B</span>
+    <span>🗄️ DuckDB</span>
+    <span>🛤️ NetworKit</span>
+</div>
+"""
+
+_SYSTEM_CARD_TEMPLATE = string.Template(
+    """
+<div class="system-card">
+    <div class="system-header">
+        <div>
+            <div class="system-device">$device</div>
+            <div class="system-os">$os_line</div>
+        </div>
+        <div class="system-uptime">⏱ $uptime</div>
+    </div>
+    <div class="stats-row">
+        <div class="stat-box">
+            <div class="stat-value $temp_class">$temp</div>
+            <div class="stat-label">Temp</div>
+        </div>
+        <div class="stat-box">
+            <div class="stat-value">$cpu%</div>
+            <div class="stat-label">CPU</div>
+        </div>
+        <div class="stat-box">
+            <div class="stat-value">$mem%</div>
+            <div class="stat-label">RAM</div>
+        </div>
+        <div class="stat-box">
+            <div class="stat-value">$disk%</div>
+            <div class="stat-label">Disk</div>
+        </div>
+    </div>
+</div>
+"""
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _system_card_base() -> string.Template:
+    """System-card template with the invariant hardware fields baked in."""
+    hw = get_static_hw_info()
+    os_line = (
+        f"{hw['os_name']} {hw['os_version']} · {hw['cpu_arch']} · "
+        f"{hw['cpu_cores']} cores"
+    )
+    return string.Template(
+        _SYSTEM_CARD_TEMPLATE.safe_substitute(
+            device=hw["device_short"], os_line=os_line
+        )
+    )
+
+
+_LLM_STATUS_HTML = {
+    True: """
+<div class="llm-status llm-online">
+    <div class="llm-dot"></div>
+    LLM Online{model_text}
+</div>
+""",
+    False: """
+<div class="llm-status llm-offline">
+    <div class="llm-dot"></div>
+    LLM Offline
+</div>
+""",
+}
+
+
+@st.fragment(run_every="3s")
 def render_system_panel():
     """Live system monitor panel with custom styling."""
-    hw = get_static_hw_info()
     stats = get_dynamic_stats()
     llm = get_llm_status()
 
@@ -542,196 +727,350 @@ def render_system_panel():
     # Uptime display
     uptime_display = stats["uptime"] if stats["uptime"] else "—"
 
-    # System card
-    st.markdown(
-        f"""
-    <div class="system-card">
-        <div class="system-header">
-            <div>
-                <div class="system-device">{hw['device_short']}</div>
-                <div class="system-os">{hw['os_name']} {hw['os_version']} · {hw['cpu_arch']} · {hw['cpu_cores']} cores</div>
-            </div>
-            <div class="system-uptime">⏱ {uptime_display}</div>
-        </div>
-        <div class="stats-row">
-            <div class="stat-box">
-                <div class="stat-value {temp_class}">{temp_display}</div>
-                <div class="stat-label">Temp</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-value">{stats['cpu_percent']:.0f}%</div>
-                <div class="stat-label">CPU</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-value">{stats['mem_percent']:.0f}%</div>
-                <div class="stat-label">RAM</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-value">{stats['disk_percent']:.0f}%</div>
-                <div class="stat-label">Disk</div>
-            </div>
-        </div>
-    </div>
-    """,
-        unsafe_allow_html=True,
+    # One write per tick: system card + LLM status in a single markdown
+    card_html = _system_card_base().substitute(
+        uptime=uptime_display,
+        temp_class=temp_class,
+        temp=temp_display,
+        cpu=f"{stats['cpu_percent']:.0f}",
+        mem=f"{stats['mem_percent']:.0f}",
+        disk=f"{stats['disk_percent']:.0f}",
     )
+    model_text = f" · {llm['model']}" if llm["online"] and llm["model"] else ""
+    llm_html = _LLM_STATUS_HTML[llm["online"]].format(model_text=model_text)
+    st.markdown(card_html + llm_html, unsafe_allow_html=True)
 
-    # LLM Status
-    if llm["online"]:
-        model_text = f" · {llm['model']}" if llm["model"] else ""
-        st.markdown(
-            f"""
-        <div class="llm-status llm-online">
-            <div class="llm-dot"></div>
-            LLM Online{model_text}
-        </div>
-        """,
-            unsafe_allow_html=True,
+
+# ============================================================================
+# Map Rendering
+# ============================================================================
+POI_COLORS = types.MappingProxyType(
+    {
+        "hospital": "red",
+        "clinic": "red",
+        "doctors": "red",
+        "pharmacy": "green",
+        "school": "blue",
+        "university": "blue",
+        "shelter": "orange",
+        "police": "darkblue",
+        "fire_station": "red",
+        "bank": "purple",
+        "atm": "purple",
+    }
+)
+
+
+# Popup templates, parsed once; loops call the bound .format directly
+_POPUP_DIST_FMT = "<b>{name}</b><br>📏 {dist:.0f}m".format
+_POPUP_WALK_FMT = "<b>{name}</b><br>🚶 {mins:.0f} min".format
+
+
+def _draw_list_pois(m, result, data, color, poi_type):
+    pois = data.get("pois", [])
+    if not pois:
+        return
+    # Unpack to parallel columns once, then build popups in one pass
+    lats, lons, names, dists = zip(
+        *(
+            (p["lat"], p["lon"], p.get("name"), p.get("distance_m", 0))
+            for p in pois
+        )
+    )
+    if len(pois) > 20:
+        # Large sets: ship one coordinate array and build markers
+        # client-side instead of a full Leaflet marker block per POI
+        rows = [
+            [lat, lon, _POPUP_DIST_FMT(name=n or f"Unnamed {poi_type}", dist=d)]
+            for lat, lon, n, d in zip(lats, lons, names, dists)
+        ]
+        callback = (
+            "function (row) {"
+            "var marker = L.marker(new L.LatLng(row[0], row[1]));"
+            "marker.bindPopup(row[2]);"
+            "return marker;}"
         )
+        FastMarkerCluster(rows, callback=callback).add_to(m)
     else:
-        st.markdown(
-            """
-        <div class="llm-status llm-offline">
-            <div class="llm-dot"></div>
-            LLM Offline
-        </div>
-        """,
-            unsafe_allow_html=True,
+        popups = [
+            _POPUP_DIST_FMT(name=n or f"Unnamed {poi_type}", dist=d)
+            for n, d in zip(names, dists)
+        ]
+        # Collect markers in one FeatureGroup so the map gets a single child
+        fg = folium.FeatureGroup()
+        for lat, lon, popup in zip(lats, lons, popups):
+            folium.Marker(
+                [lat, lon],
+                popup=popup,
+                icon=folium.Icon(color=color, icon="info-sign"),
+            ).add_to(fg)
+        fg.add_to(m)
+
+
+def _draw_nearest_pois(m, result, data, color, poi_type):
+    pois = data.get("nearest_pois", [])
+    path = data.get("path", [])
+
+    if path:
+        coords = [[p["lat"], p["lon"]] for p in path]
+        folium.PolyLine(coords, weight=4, color="#3b82f6", opacity=0.7).add_to(m)
+        if "start" in data:
+            folium.Marker(
+                [data["start"]["lat"], data["start"]["lon"]],
+                icon=folium.Icon(color="green", icon="play"),
+                popup="Start",
+            ).add_to(m)
+
+    if pois:
+        lats, lons, names, walks = zip(
+            *(
+                (p["lat"], p["lon"], p.get("name"), p["walk_minutes"])
+                for p in pois
+            )
         )
+        popups = [
+            _POPUP_WALK_FMT(name=n or "Unnamed", mins=w)
+            for n, w in zip(names, walks)
+        ]
+        # First hit gets the POI color, the rest are muted; index instead of
+        # branching per iteration. Icons stay per-marker: folium reparents a
+        # shared Icon onto its last marker only.
+        colors = (color, "lightgray")
+        fg = folium.FeatureGroup()
+        for i, (lat, lon, popup) in enumerate(zip(lats, lons, popups)):
+            folium.Marker(
+                [lat, lon],
+                popup=popup,
+                icon=folium.Icon(color=colors[min(i, 1)], icon="info-sign"),
+            ).add_to(fg)
+        fg.add_to(m)
+
+
+def _draw_route(m, result, data, color, poi_type):
+    path = data.get("path", [])
+    if path:
+        coords = [[p["lat"], p["lon"]] for p in path]
+        folium.PolyLine(coords, weight=4, color="#3b82f6", opacity=0.8).add_to(m)
+        folium.Marker(
+            coords[0], icon=folium.Icon(color="green", icon="play")
+        ).add_to(m)
+        folium.Marker(
+            coords[-1], icon=folium.Icon(color="red", icon="stop")
+        ).add_to(m)
+    for poi in data.get("pois", []):
+        folium.Marker(
+            [poi["lat"], poi["lon"]],
+            popup=poi.get("name"),
+            icon=folium.Icon(color="orange"),
+        ).add_to(m)
 
 
-# ============================================================================
-# Map Rendering
-# ============================================================================
-POI_COLORS = {
-    "hospital": "red",
-    "clinic": "red",
-    "doctors": "red",
-    "pharmacy": "green",
-    "school": "blue",
-    "university": "blue",
-    "shelter": "orange",
-    "police": "darkblue",
-    "fire_station": "red",
-    "bank": "purple",
-    "atm": "purple",
-}
-
-
-def create_map(result, location: dict) -> folium.Map:
-    """Create Folium map with results."""
+def _draw_isochrone(m, result, data, color, poi_type):
+    boundary = data.get("boundary_points", [])
+    args = result.tool_args
+    cx = args.get("lat") or args.get("start_lat")
+    cy = args.get("lon") or args.get("start_lon")
+    if boundary and cx and cy:
+        # Order boundary points by polar angle around the center, in C
+        lats = np.fromiter((p["lat"] for p in boundary), dtype=np.float64)
+        lons = np.fromiter((p["lon"] for p in boundary), dtype=np.float64)
+        order = np.argsort(np.arctan2(lats - cx, lons - cy))
+        coords = np.column_stack((lats[order], lons[order])).tolist()
+        folium.Polygon(coords, color="#a855f7", fill=True, fillOpacity=0.2).add_to(
+            m
+        )
+        folium.Marker(
+            [cx, cy], icon=folium.Icon(color="purple", icon="user")
+        ).add_to(m)
+
+
+# Tool name -> drawing handler; built once at import so create_map does a
+# single dict lookup instead of re-walking an if/elif chain per rerun
+_TOOL_HANDLERS = {
+    "list_pois": _draw_list_pois,
+    "find_nearest_poi_with_route": _draw_nearest_pois,
+    "calculate_route": _draw_route,
+    "find_along_route": _draw_route,
+    "generate_isochrone": _draw_isochrone,
+}
+
+
+def create_map(result, location):
+    """Create folium map with query results."""
     m = folium.Map(
-        location=location["center"], zoom_start=13, tiles="cartodbdark_matter"
+        location=location["center"],
+        zoom_start=13,
+        tiles="cartodbdark_matter",
     )
 
     if not result or not result.success:
         return m
 
-    for place, info in result.geocoded.items():
+    # Add geocoded places
+    for name, info in result.geocoded.items():
         folium.CircleMarker(
             [info["lat"], info["lon"]],
             radius=8,
             color="#fbbf24",
             fill=True,
-            fillColor="#fbbf24",
-            fillOpacity=0.9,
-            popup=f"📍 {place}",
+            popup=f"📍 {name}",
         ).add_to(m)
 
     data = result.result
-    tool = result.tool_name
     poi_type = data.get("poi_type", "location")
     color = POI_COLORS.get(poi_type, "gray")
 
-    if tool == "list_pois":
-        pois = data.get("pois", [])
-        for poi in pois:
-            name = poi.get("name") or f"Unnamed {poi_type}"
-            popup = f"<b>{name}</b><br>📏 {poi.get('distance_m', 0):.0f}m"
-            folium.Marker(
-                [poi["lat"], poi["lon"]],
-                popup=popup,
-                icon=folium.Icon(color=color, icon="info-sign"),
-            ).add_to(m)
+    handler = _TOOL_HANDLERS.get(result.tool_name)
+    if handler:
+        handler(m, result, data, color, poi_type)
+
+    # Fit bounds: single NumPy pass, only the bbox goes to Folium
+    seqs = [
+        result.geocoded.values(),
+        data.get("nearest_pois", []),
+        data.get("pois", []),
+        data.get("path", []),
+        data.get("boundary_points", []),
+    ]
+    if "start" in data:
+        seqs.append([data["start"]])
+    arr = np.fromiter(
+        (c for seq in seqs for p in seq for c in (p["lat"], p["lon"])),
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    if len(arr) >= 2:
+        m.fit_bounds([arr.min(0).tolist(), arr.max(0).tolist()], padding=[30, 30])
 
-    elif tool == "find_nearest_poi_with_route":
-        pois = data.get("nearest_pois", [])
-        path = data.get("path", [])
-
-        if path:
-            coords = [[p["lat"], p["lon"]] for p in path]
-            folium.PolyLine(coords, weight=4, color="#3b82f6", opacity=0.7).add_to(m)
-            if "start" in data:
-                folium.Marker(
-                    [data["start"]["lat"], data["start"]["lon"]],
-                    icon=folium.Icon(color="green", icon="play"),
-                    popup="Start",
-                ).add_to(m)
-
-        for i, poi in enumerate(pois):
-            name = poi.get("name") or f"Unnamed"
-            popup = f"<b>{name}</b><br>🚶 {poi['walk_minutes']:.0f} min"
-            mc = color if i == 0 else "lightgray"
-            folium.Marker(
-                [poi["lat"], poi["lon"]],
-                popup=popup,
-                icon=folium.Icon(color=mc, icon="info-sign"),
-            ).add_to(m)
+    return m
 
-    elif tool in ["calculate_route", "find_along_route"]:
-        path = data.get("path", [])
-        if path:
-            coords = [[p["lat"], p["lon"]] for p in path]
-            folium.PolyLine(coords, weight=4, color="#3b82f6", opacity=0.8).add_to(m)
-            folium.Marker(
-                coords[0], icon=folium.Icon(color="green", icon="play")
-            ).add_to(m)
-            folium.Marker(
-                coords[-1], icon=folium.Icon(color="red", icon="stop")
-            ).add_to(m)
-        for poi in data.get("pois", []):
-            folium.Marker(
-                [poi["lat"], poi["lon"]],
-                popup=poi.get("name"),
-                icon=folium.Icon(color="orange"),
-            ).add_to(m)
 
-    elif tool == "generate_isochrone":
-        import math
-
-        boundary = data.get("boundary_points", [])
-        args = result.tool_args
-        cx = args.get("lat") or args.get("start_lat")
-        cy = args.get("lon") or args.get("start_lon")
-        if boundary and cx and cy:
-            boundary.sort(key=lambda p: math.atan2(p["lat"] - cx, p["lon"] - cy))
-            coords = [[p["lat"], p["lon"]] for p in boundary]
-            folium.Polygon(coords, color="#a855f7", fill=True, fillOpacity=0.2).add_to(
-                m
+def _result_key(result) -> str:
+    """Stable content hash of a QueryResult, used as a map cache key."""
+    if result is None:
+        return "empty"
+    payload = orjson.dumps(
+        dataclasses.asdict(result), option=orjson.OPT_SORT_KEYS, default=str
+    )
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pretty_json(result_key: str, _data: dict) -> str:
+    """Pretty-print a result payload once per result, not per rerun."""
+    return orjson.dumps(_data, option=orjson.OPT_INDENT_2, default=str).decode()
+
+
+@st.cache_data(show_spinner=False)
+def _base_map_html(location_slug: str, lat: float, lon: float) -> str:
+    """Empty base map per slug, rendered once for the process lifetime."""
+    m = folium.Map(location=[lat, lon], zoom_start=13, tiles="cartodbdark_matter")
+    return m.get_root().render()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _map_html(location_slug: str, result_key: str, _result, _location: dict) -> str:
+    """Build and serialize the Folium map once per (slug, result)."""
+    return create_map(_result, _location).get_root().render()
+
+
+@st.fragment
+def _map_and_results(selected: str, loc: dict):
+    """Map and results panel in one fragment, isolated from outer reruns."""
+    result = st.session_state.result
+    if result is None or not result.success:
+        # Empty base map is a long-lived per-slug cache entry
+        map_html = _base_map_html(selected, *loc["center"])
+    else:
+        map_html = _map_html(selected, _result_key(result), result, loc)
+    components.html(map_html, height=450)
+
+    # Results (below map)
+    if not result or not result.success:
+        return
+
+    col_r1, col_r2, col_r3 = st.columns([1, 1, 2])
+
+    with col_r1:
+        st.metric("Query Time", f"{result.query_time:.2f}s")
+        if result.cached:
+            st.caption("⚡ cached")
+
+        if result.geocoded:
+            st.markdown(
+                '<div class="section-header">Geocoded</div>', unsafe_allow_html=True
             )
-            folium.Marker(
-                [cx, cy], icon=folium.Icon(color="purple", icon="user")
-            ).add_to(m)
+            for place, info in result.geocoded.items():
+                st.markdown(
+                    f"""
+                <div class="geo-badge">📍 {place}</div>
+                <div class="geo-coords">{info['lat']:.4f}, {info['lon']:.4f}</div>
+                """,
+                    unsafe_allow_html=True,
+                )
 
-    # Fit bounds
-    points = [[i["lat"], i["lon"]] for i in result.geocoded.values()]
-    points += [
-        [p["lat"], p["lon"]]
-        for p in data.get("nearest_pois", []) + data.get("pois", [])
-    ]
-    points += [[p["lat"], p["lon"]] for p in data.get("path", [])]
-    points += [[p["lat"], p["lon"]] for p in data.get("boundary_points", [])]
-    if "start" in data:
-        points.append([data["start"]["lat"], data["start"]["lon"]])
-    if len(points) >= 2:
-        m.fit_bounds(points, padding=[30, 30])
+    with col_r2:
+        st.markdown('<div class="section-header">Tool</div>', unsafe_allow_html=True)
+        st.code(result.tool_name, language=None)
 
-    return m
+        data = result.result
+
+        if "error" in data:
+            st.error(data["error"])
+
+        if "count" in data:
+            poi_label = data.get("poi_type", "POIs").replace("_", " ").title()
+            st.metric(poi_label, data["count"])
+
+        if "distance_km" in data and "pois_found" not in data:
+            st.metric(
+                "Route",
+                f"{data['distance_km']:.1f} km · {int(data['walk_minutes'])} min",
+            )
+
+        if "reachable_nodes" in data:
+            st.metric(
+                f"Reachable ({data['max_minutes']}m)",
+                f"{data['reachable_nodes']:,}",
+            )
+
+    with col_r3:
+        data = result.result
+        pois = data.get("nearest_pois") or data.get("pois", [])
+        if pois:
+            # One markdown element for the whole list - Streamlit's
+            # per-element overhead dominates for rows this small
+            rows = ['<div class="section-header">Results</div>']
+            for poi in pois[:6]:
+                name = poi.get("name") or "Unnamed"
+                detail = ""
+                if "walk_minutes" in poi:
+                    detail = f"· {poi['walk_minutes']:.0f} min"
+                elif "distance_m" in poi:
+                    detail = f"· {poi['distance_m']:.0f}m"
+                rows.append(
+                    f'<div class="result-item">'
+                    f'<span class="result-name">{name}</span>'
+                    f'<span class="result-detail">{detail}</span>'
+                    f"</div>"
+                )
+            st.markdown("\n".join(rows), unsafe_allow_html=True)
+            if len(pois) > 6:
+                st.caption(f"+{len(pois)-6} more")
+
+        if st.checkbox("Show JSON", value=False):
+            st.code(_pretty_json(_result_key(result), data), language="json")
 
 
 # ============================================================================
 # Main Application
 # ============================================================================
+def _on_location_change():
+    """Reset per-location state inside the selectbox's own rerun."""
+    st.session_state.result = None
+    st.session_state.query_text = ""
+    st.session_state.last_ran_query = None
+
+
 def main():
     st.set_page_config(page_title="DreamMeridian", page_icon="💠", layout="wide")
     st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
@@ -755,14 +1094,12 @@ def main():
             options=list(locations.keys()),
             format_func=lambda x: locations[x]["name"],
             key="location_select",
+            on_change=_on_location_change,
         )
         selected = st.session_state.location_select
+        st.session_state.current_location = selected
 
-        if selected != st.session_state.current_location:
-            st.session_state.current_location = selected
-            st.session_state.result = None
-            st.session_state.query_text = ""
-            st.rerun()
+        load_backend(selected)
 
         loc = locations[selected]
         st.caption(f"{loc['nodes']:,} nodes · {loc['pois']:,} POIs")
@@ -776,10 +1113,10 @@ def main():
         st.markdown(
             '<div class="section-header">Try asking</div>', unsafe_allow_html=True
         )
+        # Button clicks already rerun the script; setting state is enough
         for i, ex in enumerate(loc.get("examples", [])[:4]):
             if st.button(ex, key=f"ex_{i}", use_container_width=True):
                 st.session_state.query_text = ex
-                st.rerun()
 
     # ===== MAIN CONTENT =====
     loc = locations[selected]
@@ -790,16 +1127,7 @@ def main():
         st.markdown(f"## 💠 DreamMeridian")
         st.caption(f"Offline spatial intelligence for **{loc['name']}**")
     with col_h2:
-        st.markdown(
-            """
-        <div class="info-row" style="justify-content: flex-end; margin-top: 0.5rem;">
-            <span>🧠 xLAM-2-1B</span>
-            <span>🗄️ DuckDB</span>
-            <span>🛤️ NetworKit</span>
-        </div>
-        """,
-            unsafe_allow_html=True,
-        )
+        st.markdown(_STATIC_BANNER_HTML, unsafe_allow_html=True)
 
     # Query input
     query = st.text_input(
@@ -811,93 +1139,20 @@ def main():
     st.session_state.query_text = query
 
     if st.button("Query", type="primary", disabled=not query):
-        with st.spinner("Processing..."):
-            result = dm.query(query, location=selected)
-            st.session_state.result = result
-            if not result.success:
-                st.error(result.error)
-
-    # Map (full width)
-    map_obj = create_map(st.session_state.result, loc)
-    st_folium(map_obj, height=450, use_container_width=True)
-
-    # Results (below map)
-    result = st.session_state.result
-
-    if result and result.success:
-        col_r1, col_r2, col_r3 = st.columns([1, 1, 2])
-
-        with col_r1:
-            st.metric("Query Time", f"{result.query_time:.2f}s")
-
-            if result.geocoded:
-                st.markdown(
-                    '<div class="section-header">Geocoded</div>', unsafe_allow_html=True
-                )
-                for place, info in result.geocoded.items():
-                    st.markdown(
-                        f"""
-                    <div class="geo-badge">📍 {place}</div>
-                    <div class="geo-coords">{info['lat']:.4f}, {info['lon']:.4f}</div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
-        with col_r2:
-            st.markdown(
-                '<div class="section-header">Tool</div>', unsafe_allow_html=True
-            )
-            st.code(result.tool_name, language=None)
-
-            data = result.result
-
-            if "error" in data:
-                st.error(data["error"])
-
-            if "count" in data:
-                poi_label = data.get("poi_type", "POIs").replace("_", " ").title()
-                st.metric(poi_label, data["count"])
-
-            if "distance_km" in data and "pois_found" not in data:
-                st.metric(
-                    "Route",
-                    f"{data['distance_km']:.1f} km · {int(data['walk_minutes'])} min",
-                )
-
-            if "reachable_nodes" in data:
-                st.metric(
-                    f"Reachable ({data['max_minutes']}m)",
-                    f"{data['reachable_nodes']:,}",
-                )
+        # Re-clicking with the same text keeps the result already on screen;
+        # failures never record last_ran_query, so they stay retryable
+        if query != st.session_state.get("last_ran_query"):
+            with st.spinner("Processing..."):
+                result = run_query(selected, query)
+                st.session_state.result = result
+                if result.success:
+                    st.session_state.last_ran_query = query
+                else:
+                    st.session_state.last_ran_query = None
+                    st.error(result.error)
 
-        with col_r3:
-            data = result.result
-            pois = data.get("nearest_pois") or data.get("pois", [])
-            if pois:
-                st.markdown(
-                    '<div class="section-header">Results</div>', unsafe_allow_html=True
-                )
-                for poi in pois[:6]:
-                    name = poi.get("name") or "Unnamed"
-                    detail = ""
-                    if "walk_minutes" in poi:
-                        detail = f"· {poi['walk_minutes']:.0f} min"
-                    elif "distance_m" in poi:
-                        detail = f"· {poi['distance_m']:.0f}m"
-                    st.markdown(
-                        f"""
-                    <div class="result-item">
-                        <span class="result-name">{name}</span>
-                        <span class="result-detail">{detail}</span>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-                if len(pois) > 6:
-                    st.caption(f"+{len(pois)-6} more")
-
-            if st.checkbox("Show JSON", value=False):
-                st.json(data)
+    # Map + results (full width)
+    _map_and_results(selected, loc)
 
 
 if __name__ == "__main__":
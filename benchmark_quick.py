@@ -11,9 +11,19 @@ import subprocess
 from pathlib import Path
 
 import importlib.util
-spec = importlib.util.spec_from_file_location("dream_meridian", "dream-meridian.py")
-dm = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(dm)
+import sys
+
+# Load the engine once per process; a second spec-exec would re-open the
+# database and re-probe the LLM server for nothing
+if "dream_meridian" in sys.modules:
+    dm = sys.modules["dream_meridian"]
+else:
+    spec = importlib.util.spec_from_file_location(
+        "dream_meridian", "dream-meridian.py"
+    )
+    dm = importlib.util.module_from_spec(spec)
+    sys.modules["dream_meridian"] = dm
+    spec.loader.exec_module(dm)
 
 QUERIES = [
     ("coxs_bazar", "Find the nearest hospital to Camp 6"),
@@ -11,6 +11,9 @@ Usage:
     # Optional: download offline tiles (can be slow for large areas)
     python build_location.py "Dhaka, Bangladesh" dhaka --tiles
 
+    # Optional: revalidate cached tiles with conditional requests
+    python build_location.py "Dhaka, Bangladesh" dhaka --tiles --refresh
+
 Output:
     data/{slug}/           - spatial data
     static/tiles/{slug}/   - map tiles (only if --tiles flag used)
@@ -19,13 +22,21 @@ Output:
 import osmnx as ox
 import networkit as nk
 import duckdb
+import numpy as np
 import pandas as pd
-import json
+import orjson
+import os
+import random
 import time
 import sys
 import math
 import requests
+import shutil
+import subprocess
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import formatdate
 from pathlib import Path
 
 # Suppress geometry warnings
@@ -37,8 +48,16 @@ warnings.filterwarnings("ignore", message=".*Overpass max query area.*")
 # ============================================================================
 
 TILE_ZOOM_LEVELS = range(11, 17)
-TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+TILE_URLS = [
+    "https://tile.openstreetmap.org/{z}/{x}/{y}.png",
+    "https://a.tile.openstreetmap.org/{z}/{x}/{y}.png",
+    "https://b.tile.openstreetmap.org/{z}/{x}/{y}.png",
+    "https://c.tile.openstreetmap.org/{z}/{x}/{y}.png",
+]
 TILE_RATE_LIMIT = 0.1
+TILE_WORKERS = 2  # OSM tile usage policy allows 2 concurrent connections
+TILE_RETRIES = 3
+TILE_BACKOFF = 0.5  # base seconds, doubled per attempt
 
 # Place names (neighborhoods, suburbs, etc.) for geocoding
 PLACE_TAGS = {
@@ -203,24 +222,55 @@ OSM_TAGS = {
 # ============================================================================
 
 
+# Memoized per graph so bounds/center/config don't re-traverse the nodes;
+# kept out of G_nx.graph so nothing leaks into the saved GraphML
+_extents_cache = {}
+
+
+def _node_coords(G_nx):
+    """(lats, lons) node coordinate arrays in one pass over the graph."""
+    lats = np.fromiter(
+        (d["y"] for _, d in G_nx.nodes(data=True) if "y" in d), dtype=np.float64
+    )
+    lons = np.fromiter(
+        (d["x"] for _, d in G_nx.nodes(data=True) if "x" in d), dtype=np.float64
+    )
+    return lats, lons
+
+
+def _node_extents(G_nx):
+    """(lat_min, lat_max, lon_min, lon_max) in one NumPy pass per graph."""
+    cached = _extents_cache.get(id(G_nx))
+    if cached is not None:
+        return cached
+
+    lats, lons = _node_coords(G_nx)
+    extents = (
+        float(lats.min()),
+        float(lats.max()),
+        float(lons.min()),
+        float(lons.max()),
+    )
+    _extents_cache[id(G_nx)] = extents
+    return extents
+
+
 def get_graph_bounds(G_nx):
     """Extract bounding box from NetworkX graph."""
-    lats = [data["y"] for _, data in G_nx.nodes(data=True) if "y" in data]
-    lons = [data["x"] for _, data in G_nx.nodes(data=True) if "x" in data]
+    lat_min, lat_max, lon_min, lon_max = _node_extents(G_nx)
     padding = 0.005
     return {
-        "north": max(lats) + padding,
-        "south": min(lats) - padding,
-        "east": max(lons) + padding,
-        "west": min(lons) - padding,
+        "north": lat_max + padding,
+        "south": lat_min - padding,
+        "east": lon_max + padding,
+        "west": lon_min - padding,
     }
 
 
 def get_graph_center(G_nx):
     """Get center point of graph."""
-    lats = [data["y"] for _, data in G_nx.nodes(data=True) if "y" in data]
-    lons = [data["x"] for _, data in G_nx.nodes(data=True) if "x" in data]
-    return {"lat": (max(lats) + min(lats)) / 2, "lon": (max(lons) + min(lons)) / 2}
+    lat_min, lat_max, lon_min, lon_max = _node_extents(G_nx)
+    return {"lat": (lat_max + lat_min) / 2, "lon": (lon_max + lon_min) / 2}
 
 
 def lat_lon_to_tile(lat, lon, zoom):
@@ -233,18 +283,95 @@ def lat_lon_to_tile(lat, lon, zoom):
 
 
 def get_tile_range(bounds, zoom):
-    """Get all tile coordinates within bounds for a zoom level."""
+    """Get all (z, x, y) tile coordinates within bounds for a zoom level."""
     x_min, y_max = lat_lon_to_tile(bounds["south"], bounds["west"], zoom)
     x_max, y_min = lat_lon_to_tile(bounds["north"], bounds["east"], zoom)
-    tiles = []
-    for x in range(x_min, x_max + 1):
-        for y in range(y_min, y_max + 1):
-            tiles.append((zoom, x, y))
-    return tiles
+    # Build the grid in NumPy; high zooms enumerate tens of thousands of tiles
+    xs, ys = np.meshgrid(
+        np.arange(x_min, x_max + 1, dtype=np.int32),
+        np.arange(y_min, y_max + 1, dtype=np.int32),
+        indexing="ij",
+    )
+    return np.column_stack(
+        (np.full(xs.size, zoom, dtype=np.int32), xs.ravel(), ys.ravel())
+    )
 
 
-def download_tiles(bounds, slug, zooms=TILE_ZOOM_LEVELS):
-    """Download tiles to static/tiles/{slug}/ for Streamlit serving."""
+def _occupied_tiles(node_coords, zoom):
+    """Set of (x, y) tiles at a zoom that contain graph nodes, dilated ±1.
+
+    The bounding rectangle of a coastal or riverine city covers a lot of
+    empty water; only tiles with (or adjacent to) street-network nodes are
+    worth downloading.
+    """
+    lats, lons = node_coords
+    n = 2**zoom
+    xs = ((lons + 180.0) / 360.0 * n).astype(np.int64)
+    ys = ((1 - np.arcsinh(np.tan(np.radians(lats))) / np.pi) / 2 * n).astype(np.int64)
+    base = np.unique(np.column_stack((xs, ys)), axis=0)
+    occupied = set()
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            occupied.update(map(tuple, (base + (dx, dy)).tolist()))
+    return occupied
+
+
+def _optimize_tiles(paths):
+    """Recompress freshly downloaded PNGs in place with oxipng, if installed.
+
+    OSM tiles are rarely optimally compressed; a lossless -o2 pass trims
+    10-30% of on-disk size. Silently a no-op when oxipng is not on PATH.
+    """
+    if not paths or shutil.which("oxipng") is None:
+        return
+    print(f"  Optimizing {len(paths)} tiles with oxipng...")
+    # oxipng multithreads internally; batch the argv to stay under limits
+    for i in range(0, len(paths), 500):
+        try:
+            subprocess.run(
+                ["oxipng", "-o2", "--quiet", *paths[i : i + 500]],
+                check=False,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return
+
+
+def _scan_existing_tiles(tile_dir):
+    """Collect already-downloaded (z, x, y) triples in one directory walk."""
+    existing = set()
+    try:
+        for z_entry in os.scandir(tile_dir):
+            if not z_entry.is_dir():
+                continue
+            for x_entry in os.scandir(z_entry.path):
+                if not x_entry.is_dir():
+                    continue
+                for y_entry in os.scandir(x_entry.path):
+                    if y_entry.name.endswith(".png"):
+                        try:
+                            existing.add(
+                                (
+                                    int(z_entry.name),
+                                    int(x_entry.name),
+                                    int(y_entry.name[:-4]),
+                                )
+                            )
+                        except ValueError:
+                            continue
+    except FileNotFoundError:
+        pass
+    return existing
+
+
+def download_tiles(bounds, slug, zooms=TILE_ZOOM_LEVELS, refresh=False, node_coords=None):
+    """Download tiles to static/tiles/{slug}/ for Streamlit serving.
+
+    With refresh=True, cached tiles are revalidated via If-Modified-Since;
+    a 304 costs no body bytes, a 200 rewrites the tile. When node_coords
+    is given, tiles without any street-network node nearby are skipped.
+    """
     print("\n" + "=" * 70)
     print("DOWNLOADING MAP TILES")
     print("=" * 70)
@@ -254,49 +381,108 @@ def download_tiles(bounds, slug, zooms=TILE_ZOOM_LEVELS):
     tile_dir.mkdir(parents=True, exist_ok=True)
 
     all_tiles = []
+    skipped_empty = 0
     for z in zooms:
-        all_tiles.extend(get_tile_range(bounds, z))
+        tiles = get_tile_range(bounds, z).tolist()
+        if node_coords is not None:
+            occupied = _occupied_tiles(node_coords, z)
+            kept = [t for t in tiles if (t[1], t[2]) in occupied]
+            skipped_empty += len(tiles) - len(kept)
+            tiles = kept
+        all_tiles.extend(tiles)
 
     print(f"\nBounds: N={bounds['north']:.4f} S={bounds['south']:.4f}")
     print(f"        E={bounds['east']:.4f} W={bounds['west']:.4f}")
     print(f"Zoom levels: {min(zooms)}-{max(zooms)}")
     print(f"Total tiles: {len(all_tiles)}")
+    if skipped_empty:
+        print(f"Skipped (no street network): {skipped_empty}")
     print(f"Output: {tile_dir}/")
 
-    headers = {"User-Agent": "DreamMeridian/1.0 (Humanitarian AI Project)"}
-    downloaded = skipped = failed = 0
+    session = requests.Session()
+    session.headers["User-Agent"] = "DreamMeridian/1.0 (Humanitarian AI Project)"
+    counts = {"downloaded": 0, "skipped": 0, "failed": 0}
+    new_paths = []  # list.append is atomic, safe across workers
     start_time = time.time()
 
-    for i, (z, x, y) in enumerate(all_tiles):
+    # One scandir walk replaces a stat per tile; on re-runs with a warm cache
+    # the hot path becomes a set lookup
+    existing = _scan_existing_tiles(tile_dir)
+
+    # Precreate every z/x directory once instead of mkdir per tile
+    for z, x in {(z, x) for z, x, _ in all_tiles}:
+        (tile_dir / f"{z}/{x}").mkdir(parents=True, exist_ok=True)
+
+    # Shared token bucket: workers overlap I/O but the request rate stays
+    # capped at 1/TILE_RATE_LIMIT across all of them
+    pace_lock = threading.Lock()
+    next_slot = [time.monotonic()]
+
+    def _pace():
+        with pace_lock:
+            now = time.monotonic()
+            wait = next_slot[0] - now
+            next_slot[0] = max(now, next_slot[0]) + TILE_RATE_LIMIT
+        if wait > 0:
+            time.sleep(wait)
+
+    def fetch_tile(zxy):
+        z, x, y = zxy
+        cached = (z, x, y) in existing
+        if cached and not refresh:
+            return "skipped"
         tile_path = tile_dir / f"{z}/{x}/{y}.png"
 
-        if tile_path.exists():
-            skipped += 1
-            continue
-
-        tile_path.parent.mkdir(parents=True, exist_ok=True)
+        cond_headers = None
+        if cached:
+            cond_headers = {
+                "If-Modified-Since": formatdate(tile_path.stat().st_mtime, usegmt=True)
+            }
 
-        url = TILE_URL.format(z=z, x=x, y=y)
-        try:
-            resp = requests.get(url, headers=headers, timeout=10)
-            if resp.status_code == 200:
-                tile_path.write_bytes(resp.content)
-                downloaded += 1
-            else:
-                failed += 1
-        except:
-            failed += 1
-
-        if (i + 1) % 100 == 0 or (i + 1) == len(all_tiles):
-            elapsed = time.time() - start_time
-            rate = (i + 1) / elapsed if elapsed > 0 else 0
-            remaining = (len(all_tiles) - i - 1) / rate if rate > 0 else 0
-            print(
-                f"  [{i + 1}/{len(all_tiles)}] +{downloaded} cached:{skipped} failed:{failed} ETA:{remaining:.0f}s"
-            )
+        # Retry transient failures with exponential backoff, rotating to the
+        # next mirror each attempt so a rate-limited host isn't re-hit
+        for attempt in range(TILE_RETRIES):
+            url = TILE_URLS[attempt % len(TILE_URLS)].format(z=z, x=x, y=y)
+            _pace()
+            try:
+                resp = session.get(url, timeout=10, headers=cond_headers)
+                if resp.status_code == 304:
+                    return "skipped"
+                if resp.status_code == 200:
+                    tile_path.write_bytes(resp.content)
+                    new_paths.append(str(tile_path))
+                    return "downloaded"
+                if resp.status_code not in (429, 500, 502, 503, 504):
+                    return "failed"
+                retry_after = resp.headers.get("Retry-After")
+            except:
+                retry_after = None
+            if attempt + 1 < TILE_RETRIES:
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = TILE_BACKOFF * 2**attempt + random.random() * 0.1
+                time.sleep(delay)
+        return "failed"
+
+    with ThreadPoolExecutor(max_workers=TILE_WORKERS) as executor:
+        for i, outcome in enumerate(executor.map(fetch_tile, all_tiles)):
+            counts[outcome] += 1
+            if (i + 1) % 100 == 0 or (i + 1) == len(all_tiles):
+                elapsed = time.time() - start_time
+                rate = (i + 1) / elapsed if elapsed > 0 else 0
+                remaining = (len(all_tiles) - i - 1) / rate if rate > 0 else 0
+                print(
+                    f"  [{i + 1}/{len(all_tiles)}] +{counts['downloaded']} cached:{counts['skipped']} failed:{counts['failed']} ETA:{remaining:.0f}s"
+                )
+
+    downloaded, skipped, failed = (
+        counts["downloaded"],
+        counts["skipped"],
+        counts["failed"],
+    )
 
-        if downloaded > 0:
-            time.sleep(TILE_RATE_LIMIT)
+    _optimize_tiles(new_paths)
 
     total_size = sum(f.stat().st_size for f in tile_dir.rglob("*.png"))
     print(f"\n✓ Tiles: {downloaded} new, {skipped} cached, {failed} failed")
@@ -315,12 +501,30 @@ def networkx_to_networkit(G_nx):
     node_mapping = {node: i for i, node in enumerate(G_nx.nodes())}
     reverse_mapping = {i: node for node, i in node_mapping.items()}
 
-    n = len(G_nx.nodes())
-    G_nk = nk.Graph(n, weighted=True, directed=False)
-
-    for u, v, data in G_nx.edges(data=True):
-        weight = data.get("length", 1.0)
-        G_nk.addEdge(node_mapping[u], node_mapping[v], weight)
+    n = len(node_mapping)
+    m = G_nx.number_of_edges()
+    get_id = node_mapping.__getitem__
+
+    if hasattr(nk, "GraphFromCoo") and m:
+        # Bulk construction: fill three arrays in one pass and hand them to
+        # NetworKit in a single call instead of one addEdge per edge
+        u_idx = np.empty(m, dtype=np.uint64)
+        v_idx = np.empty(m, dtype=np.uint64)
+        weights = np.empty(m, dtype=np.float64)
+        for i, (u, v, length) in enumerate(G_nx.edges(data="length", default=1.0)):
+            u_idx[i] = get_id(u)
+            v_idx[i] = get_id(v)
+            weights[i] = length
+        G_nk = nk.GraphFromCoo(
+            (weights, (u_idx, v_idx)), n=n, weighted=True, directed=False
+        )
+    else:
+        # Length-only edge view and bound methods keep the per-edge cost to
+        # two dict lookups and one Cython call
+        G_nk = nk.Graph(n, weighted=True, directed=False)
+        add_edge = G_nk.addEdge
+        for u, v, length in G_nx.edges(data="length", default=1.0):
+            add_edge(get_id(u), get_id(v), length)
 
     return G_nk, node_mapping, reverse_mapping
 
@@ -335,9 +539,23 @@ def save_graph(G_nx, G_nk, node_mapping, reverse_mapping, output_dir, slug):
     nkb_path = output_dir / f"{slug}.nkb"
     nk.graphio.writeGraph(G_nk, str(nkb_path), nk.Format.NetworkitBinary)
 
-    mapping_path = output_dir / f"{slug}_mappings.json"
-    with open(mapping_path, "w") as f:
-        json.dump({"nx_to_nk": node_mapping, "nk_to_nx": reverse_mapping}, f)
+    # Two int64 Parquet columns instead of a JSON dict with 2N entries;
+    # the reverse mapping is just the inverse, so one table covers both
+    mdf = pd.DataFrame(
+        {
+            "nx_id": np.fromiter(
+                node_mapping.keys(), dtype=np.int64, count=len(node_mapping)
+            ),
+            "nk_id": np.fromiter(
+                node_mapping.values(), dtype=np.int64, count=len(node_mapping)
+            ),
+        }
+    )
+    mapping_path = output_dir / f"{slug}_mappings.parquet"
+    duckdb.execute(
+        f"COPY (SELECT * FROM mdf) TO '{mapping_path}' "
+        "(FORMAT PARQUET, COMPRESSION ZSTD)"
+    )
 
     print(f"  ✓ {slug}.graphml: {graphml_path.stat().st_size / 1024 / 1024:.1f} MB")
     print(f"  ✓ {slug}.nkb: {nkb_path.stat().st_size / 1024 / 1024:.1f} MB")
@@ -358,27 +576,73 @@ def export_nodes_to_duckdb(G_nx, db_path):
     con.install_extension("spatial")
     con.load_extension("spatial")
 
+    # One pass over the node view into columnar arrays; DuckDB ingests the
+    # DataFrame in bulk instead of a prepared-statement round trip per row
     nodes_data = [
-        (node, data["y"], data["x"], data["x"], data["y"])
+        (node, data["y"], data["x"])
         for node, data in G_nx.nodes(data=True)
         if "y" in data and "x" in data
     ]
+    df = pd.DataFrame(nodes_data, columns=["node_id", "lat", "lon"])
 
-    print(f"✓ Extracted {len(nodes_data):,} nodes")
+    print(f"✓ Extracted {len(df):,} nodes")
 
     con.execute("DROP TABLE IF EXISTS nodes")
     con.execute(
         """
-        CREATE TABLE nodes (
-            node_id BIGINT PRIMARY KEY, lat DOUBLE, lon DOUBLE, geom GEOMETRY
-        )
+        CREATE TABLE nodes AS
+        SELECT node_id, lat, lon, ST_Point(lon, lat) AS geom FROM df
     """
     )
-    con.executemany("INSERT INTO nodes VALUES (?, ?, ?, ST_Point(?, ?))", nodes_data)
     con.execute("CREATE INDEX nodes_geom_idx ON nodes USING RTREE (geom)")
     con.close()
 
 
+OVERPASS_ENDPOINTS = [
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.private.coffee/api/interpreter",
+    "https://overpass.osm.jp/api/interpreter",
+]
+
+
+def _set_overpass_endpoint(url):
+    """Point osmnx at an Overpass endpoint (setting name varies by version)."""
+    if hasattr(ox.settings, "overpass_url"):
+        ox.settings.overpass_url = url
+    else:
+        ox.settings.overpass_endpoint = url
+
+
+# osmnx's endpoint setting is process-global, so concurrent workers share one
+# endpoint index that only moves forward on failure instead of each thread
+# writing its own rotation over the others'
+_overpass_lock = threading.Lock()
+_overpass_idx = 0
+
+
+def _features_with_failover(place_name, tags):
+    """features_from_place with failover across public Overpass endpoints.
+
+    A worker that fails on an endpoint advances the shared index only if no
+    other worker has moved past it already; a failure caused by the endpoint
+    switching mid-request just retries on the newer one.
+    """
+    global _overpass_idx
+    last_error = None
+    for _ in range(len(OVERPASS_ENDPOINTS)):
+        with _overpass_lock:
+            idx = _overpass_idx
+            _set_overpass_endpoint(OVERPASS_ENDPOINTS[idx])
+        try:
+            return ox.features_from_place(place_name, tags=tags)
+        except Exception as e:
+            last_error = e
+            with _overpass_lock:
+                if _overpass_idx == idx:
+                    _overpass_idx = (idx + 1) % len(OVERPASS_ENDPOINTS)
+    raise last_error
+
+
 def download_osm_features(place_name):
     """Download humanitarian-relevant OSM features. Falls back to chunked queries for large areas."""
     print("\n" + "=" * 70)
@@ -392,7 +656,7 @@ def download_osm_features(place_name):
     start = time.time()
 
     try:
-        gdf = ox.features_from_place(place_name, tags=OSM_TAGS)
+        gdf = _features_with_failover(place_name, OSM_TAGS)
         print(f"✓ {len(gdf):,} features ({time.time()-start:.1f}s)")
         return _process_features(gdf)
 
@@ -403,24 +667,24 @@ def download_osm_features(place_name):
             print(f"failed: {str(e)[:50]}")
             print("Falling back to chunked queries...")
 
-    # Fall back to separate queries per tag type
+    # Fall back to separate queries per tag type, dispatched concurrently -
+    # each is a multi-second network round trip to Overpass
     all_gdfs = []
-    for tag_key, tag_values in OSM_TAGS.items():
-        print(f"  {tag_key}... ", end="", flush=True)
-        start = time.time()
-
-        try:
-            if tag_values is True:
-                tags = {tag_key: True}
-            else:
-                tags = {tag_key: tag_values}
-
-            gdf = ox.features_from_place(place_name, tags=tags)
-            all_gdfs.append(gdf)
-            print(f"✓ {len(gdf):,} ({time.time()-start:.1f}s)")
-
-        except Exception as e:
-            print(f"✗ {str(e)[:40]}")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {
+            executor.submit(
+                _features_with_failover, place_name, {tag_key: tag_values}
+            ): tag_key
+            for tag_key, tag_values in OSM_TAGS.items()
+        }
+        for future in as_completed(futures):
+            tag_key = futures[future]
+            try:
+                gdf = future.result()
+                all_gdfs.append(gdf)
+                print(f"  {tag_key}: ✓ {len(gdf):,}")
+            except Exception as e:
+                print(f"  {tag_key}: ✗ {str(e)[:40]}")
 
     if not all_gdfs:
         print("No features downloaded!")
@@ -444,37 +708,33 @@ def _process_features(gdf):
     gdf["lat"] = gdf["centroid"].y
     gdf["lon"] = gdf["centroid"].x
 
-    # Extract tag_key and tag_value from whichever column is present
-    def get_tag_info(row):
-        for key in OSM_TAGS.keys():
-            if key in row.index and pd.notna(row[key]):
-                return key, str(row[key])
-        return "other", "yes"
-
-    tag_info = gdf.apply(get_tag_info, axis=1)
-    gdf["tag_key"] = [t[0] for t in tag_info]
-    gdf["tag_value"] = [t[1] for t in tag_info]
+    # Extract tag_key and tag_value from whichever column is present.
+    # np.select keeps the OSM_TAGS priority order the old per-row apply had
+    # while doing the first-match scan in C
+    present = [k for k in OSM_TAGS if k in gdf.columns]
+    conds = [gdf[k].notna().to_numpy() for k in present]
+    gdf["tag_key"] = np.select(conds, present, default="other")
+    gdf["tag_value"] = np.select(
+        conds, [gdf[k].astype(str) for k in present], default="yes"
+    )
 
     cols = ["lat", "lon", "name", "tag_key", "tag_value"]
     cols = [c for c in cols if c in gdf.columns]
 
-    result = gdf[cols].to_dict("records")
+    # Deduplicate in pandas: same name + same location (rounded to 4 decimal
+    # places, ~11m precision) + same type
+    before_count = len(gdf)
+    gdf["_lat"] = gdf["lat"].round(4)
+    gdf["_lon"] = gdf["lon"].round(4)
+    subset = [c for c in ("name", "_lat", "_lon", "tag_value") if c in gdf.columns]
+    gdf = gdf.drop_duplicates(subset=subset)
 
-    # Deduplicate: same name + same location (within ~10m)
-    before_count = len(result)
-    seen = set()
-    deduped = []
-    for r in result:
-        # Round to 4 decimal places (~11m precision)
-        key = (r.get("name"), round(r["lat"], 4), round(r["lon"], 4), r["tag_value"])
-        if key not in seen:
-            seen.add(key)
-            deduped.append(r)
+    result = gdf[cols].to_dict("records")
 
-    removed = before_count - len(deduped)
-    print(f"✓ Processed {len(deduped):,} features ({removed:,} duplicates removed)")
+    removed = before_count - len(result)
+    print(f"✓ Processed {len(result):,} features ({removed:,} duplicates removed)")
 
-    return deduped
+    return result
 
 
 def download_places(place_name):
@@ -486,7 +746,7 @@ def download_places(place_name):
     print(f"\nTags: {', '.join(PLACE_TAGS.keys())}")
 
     try:
-        gdf = ox.features_from_place(place_name, tags=PLACE_TAGS)
+        gdf = _features_with_failover(place_name, PLACE_TAGS)
         print(f"✓ {len(gdf):,} places found")
     except Exception as e:
         print(f"✗ Failed: {e}")
@@ -502,33 +762,18 @@ def download_places(place_name):
     gdf["lon"] = gdf["centroid"].x
 
     # Extract place type
-    def get_place_type(row):
-        if "place" in row.index and pd.notna(row["place"]):
-            return str(row["place"])
-        return "unknown"
-
-    gdf["place_type"] = gdf.apply(get_place_type, axis=1)
+    if "place" in gdf.columns:
+        gdf["place_type"] = gdf["place"].where(gdf["place"].notna(), "unknown").astype(str)
+    else:
+        gdf["place_type"] = "unknown"
 
-    # Filter to rows with names
+    # Filter to rows with names, dedupe case-insensitively (vectorized;
+    # keeps the first occurrence like the old seen-set loop did)
     gdf = gdf[gdf["name"].notna()].copy()
+    gdf["name_lower"] = gdf["name"].str.lower()
+    gdf = gdf.drop_duplicates(subset="name_lower")
 
-    places = []
-    seen = set()
-    for _, row in gdf.iterrows():
-        name = row["name"]
-        # Dedupe by name (case-insensitive)
-        key = name.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-        places.append(
-            {
-                "name": name,
-                "lat": row["lat"],
-                "lon": row["lon"],
-                "place_type": row["place_type"],
-            }
-        )
+    places = gdf[["name", "lat", "lon", "place_type"]].to_dict("records")
 
     print(f"✓ {len(places):,} unique places")
 
@@ -618,10 +863,14 @@ def load_features_to_duckdb(features, db_path):
     if "name" not in df.columns:
         df["name"] = None
 
-    con.execute("CREATE TABLE osm_features AS SELECT * FROM df")
-    con.execute("ALTER TABLE osm_features ADD COLUMN geom GEOMETRY")
+    # Compute geom inside the CTAS so the table is written once; the UPDATE
+    # variant rewrote every row and the R-tree then indexed the rewrite
     con.execute(
-        "UPDATE osm_features SET geom = ST_Point(lon, lat) WHERE lon IS NOT NULL"
+        """
+        CREATE TABLE osm_features AS
+        SELECT *, CASE WHEN lon IS NOT NULL THEN ST_Point(lon, lat) END AS geom
+        FROM df
+    """
     )
     con.execute("CREATE INDEX osm_features_geom_idx ON osm_features USING RTREE (geom)")
     con.execute("CREATE INDEX osm_features_tag_idx ON osm_features(tag_key, tag_value)")
@@ -672,8 +921,8 @@ def save_config(output_dir, slug, location_name, G_nx, poi_count, place_count):
     }
 
     config_path = output_dir / "config.json"
-    with open(config_path, "w") as f:
-        json.dump(config, f, indent=2)
+    with open(config_path, "wb") as f:
+        f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
     print(f"  ✓ config.json")
 
 
@@ -696,6 +945,7 @@ def main():
     location_name = sys.argv[1]
     slug = sys.argv[2].lower().replace(" ", "_").replace("'", "")
     download_tiles_flag = "--tiles" in sys.argv
+    refresh_flag = "--refresh" in sys.argv
 
     print("\n" + "=" * 70)
     print("DREAM MERIDIAN - LOCATION BUILDER")
@@ -747,7 +997,9 @@ def main():
     # Optional: Map tiles
     if download_tiles_flag:
         print("\n[+] Downloading map tiles (this may take a while)...")
-        download_tiles(bounds, slug)
+        download_tiles(
+            bounds, slug, refresh=refresh_flag, node_coords=_node_coords(G_nx)
+        )
 
     # Save config
     print("\nFinalizing...")
@@ -774,7 +1026,7 @@ Files:
   data/{slug}/
     ├── {slug}.nkb              (road network)
     ├── {slug}.duckdb           (spatial database)
-    ├── {slug}_mappings.json    (node mappings)
+    ├── {slug}_mappings.parquet (node mappings)
     └── config.json             (metadata)
   
   {tiles_info}
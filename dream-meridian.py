@@ -13,21 +13,36 @@ Usage:
 """
 
 import argparse
+import atexit
 import json
+import orjson
+import re
 import sys
+import threading
 import time
 import requests
-from dataclasses import dataclass, asdict
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass, replace
 from pathlib import Path
 
-import spatial_tools
-import geocode_layer
+# spatial_tools pulls in networkit/duckdb/scipy (~1s on a Pi); import it
+# lazily inside the functions that need it so --list and --help stay snappy.
+# Python's import cache makes the repeated import statements free after the
+# first call.
 
 # ============================================================================
 # Configuration
 # ============================================================================
 
 LLAMA_URL = "http://localhost:8080/v1/chat/completions"
+HEALTH_URL = LLAMA_URL.replace("/v1/chat/completions", "/health")
+
+# Shared session so the socket to llama-server is reused across calls
+_SESSION = requests.Session()
+_SESSION.mount(
+    "http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+)
+atexit.register(_SESSION.close)
 
 SYSTEM_PROMPT = """Select ONE tool. Output JSON only.
 
@@ -42,6 +57,28 @@ Tools:
 - generate_isochrone(lat,lon,max_minutes) - Walkable area from point
 - calculate_route(start_lat,start_lon,end_lat,end_lon) - Walking route between points"""
 
+# Base request body built once; cache_prompt keeps the system-prompt KV cache
+# warm in llama-server so only the user message is prefilled per query
+_BASE_BODY = {
+    "model": "xLAM",
+    "messages": [{"role": "system", "content": SYSTEM_PROMPT}, None],
+    "cache_prompt": True,
+    "stream": True,
+}
+
+# Exact-match cache: (location, normalized query) -> QueryResult. Repeated
+# identical queries skip geocoding, the LLM round trip, and tool execution.
+_EXACT_CACHE = {}
+_EXACT_CACHE_MAX = 512
+
+_NORM_RE = re.compile(r"\s+")
+_PUNCT_TBL = str.maketrans("", "", ",.;:!?")
+
+
+def _norm(q: str) -> str:
+    """Cache-key normalization: case, trailing punctuation, whitespace runs."""
+    return _NORM_RE.sub(" ", q.strip().lower().translate(_PUNCT_TBL))
+
 # ============================================================================
 # Terminal Colors
 # ============================================================================
@@ -65,7 +102,7 @@ class C:
 # ============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMStats:
     """Stats from llama.cpp inference."""
 
@@ -76,10 +113,16 @@ class LLMStats:
     tokens_per_sec: float = 0
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_ms": self.prompt_ms,
+            "completion_ms": self.completion_ms,
+            "tokens_per_sec": self.tokens_per_sec,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryResult:
     """Result of a spatial query."""
 
@@ -92,12 +135,23 @@ class QueryResult:
     llm_stats: LLMStats = None
     success: bool = True
     error: str = None
+    cached: bool = False
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        if self.llm_stats:
-            d["llm_stats"] = self.llm_stats.to_dict()
-        return d
+        # Shallow by hand: asdict() deep-copies the result payload, which is
+        # pure waste when the dict is serialized immediately afterwards
+        return {
+            "tool_name": self.tool_name,
+            "tool_args": self.tool_args,
+            "result": self.result,
+            "geocoded": self.geocoded,
+            "query_time": self.query_time,
+            "modified_query": self.modified_query,
+            "llm_stats": self.llm_stats.to_dict() if self.llm_stats else None,
+            "success": self.success,
+            "error": self.error,
+            "cached": self.cached,
+        }
 
 
 # ============================================================================
@@ -105,30 +159,54 @@ class QueryResult:
 # ============================================================================
 
 
+# list_locations cache: (config-path/mtime signature, parsed locations).
+# main() hits this twice per run; the second call costs only the stats.
+_locations_cache = (None, None)
+
+
 def list_locations() -> dict:
     """Find all built locations by scanning for config.json files."""
+    global _locations_cache
+
+    config_paths = sorted(Path("data").glob("*/config.json"))
+    signature = tuple((str(p), p.stat().st_mtime_ns) for p in config_paths)
+    if signature == _locations_cache[0]:
+        return _locations_cache[1]
+
     locations = {}
-    for config_path in Path("data").glob("*/config.json"):
+    for config_path in config_paths:
         try:
-            with open(config_path) as f:
-                config = json.load(f)
-                slug = config["slug"]
-                locations[slug] = {
-                    "name": config["name"],
-                    "center": [config["center"]["lat"], config["center"]["lon"]],
-                    "bounds": config["bounds"],
-                    "nodes": config.get("nodes", 0),
-                    "edges": config.get("edges", 0),
-                    "pois": config.get("pois", 0),
-                    "places": config.get("places", 0),
-                }
+            config = orjson.loads(config_path.read_bytes())
+            slug = config["slug"]
+            locations[slug] = {
+                "name": config["name"],
+                "center": [config["center"]["lat"], config["center"]["lon"]],
+                "bounds": config["bounds"],
+                "nodes": config.get("nodes", 0),
+                "edges": config.get("edges", 0),
+                "pois": config.get("pois", 0),
+                "places": config.get("places", 0),
+            }
         except (json.JSONDecodeError, KeyError):
             continue
+
+    _locations_cache = (signature, locations)
     return locations
 
 
 def load_location(slug: str) -> bool:
     """Load spatial data for a location."""
+    import spatial_tools
+    import geocode_layer
+
+    # Both sub-loaders are idempotent, but skip the calls outright when the
+    # slug is already active in both
+    if (
+        spatial_tools.current_location == slug
+        and geocode_layer.current_location == slug
+    ):
+        return True
+
     try:
         spatial_tools.load_location(slug)
         geocode_layer.load_location(slug)
@@ -139,6 +217,8 @@ def load_location(slug: str) -> bool:
 
 def get_current_location() -> str:
     """Return currently loaded location slug."""
+    import spatial_tools
+
     return spatial_tools.current_location
 
 
@@ -149,16 +229,20 @@ def get_current_location() -> str:
 
 def check_llm_server(url: str = LLAMA_URL) -> dict:
     """Check if llama-server is responding."""
-    health_url = url.replace("/v1/chat/completions", "/health")
+    health_url = (
+        HEALTH_URL if url == LLAMA_URL else url.replace("/v1/chat/completions", "/health")
+    )
     try:
-        r = requests.get(health_url, timeout=2)
-        return {"online": r.status_code == 200, "url": url}
+        online = _SESSION.get(health_url, timeout=0.25).status_code == 200
     except requests.exceptions.RequestException:
-        return {"online": False, "url": url}
+        online = False
+    return {"online": online, "url": url}
 
 
 def health_check() -> dict:
     """Full system health check."""
+    import spatial_tools
+
     locations = list_locations()
     llm = check_llm_server()
     current = get_current_location()
@@ -182,6 +266,9 @@ def query(
     user_query: str, location: str = None, llm_url: str = LLAMA_URL
 ) -> QueryResult:
     """Process a natural language spatial query."""
+    import spatial_tools
+    import geocode_layer
+
     start_time = time.time()
 
     # Load location if specified and different
@@ -211,25 +298,25 @@ def query(
             error="No location loaded. Use load_location() first.",
         )
 
+    cache_key = (get_current_location(), _norm(user_query))
+    hit = _EXACT_CACHE.get(cache_key)
+    if hit is not None:
+        return replace(hit, query_time=time.time() - start_time, cached=True)
+
     # Geocode place names in query
     try:
         modified_query, geocoded = geocode_layer.geocode_query(user_query)
     except Exception:
         modified_query, geocoded = user_query, {}
 
-    # Call LLM for tool selection
+    # Call LLM for tool selection (streamed so we can stop at the closing brace)
+    body = dict(_BASE_BODY)
+    body["messages"] = [
+        _BASE_BODY["messages"][0],
+        {"role": "user", "content": modified_query},
+    ]
     try:
-        response = requests.post(
-            llm_url,
-            json={
-                "model": "xLAM",
-                "messages": [
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": modified_query},
-                ],
-            },
-            timeout=120,
-        )
+        response = _SESSION.post(llm_url, json=body, timeout=120, stream=True)
         response.raise_for_status()
     except requests.exceptions.ConnectionError:
         return QueryResult(
@@ -254,28 +341,61 @@ def query(
             error="LLM request timed out.",
         )
 
-    # Parse LLM response
+    # Parse the SSE stream: accumulate content until the tool-call JSON is
+    # complete, then read the last few lines through [DONE] because llama.cpp
+    # attaches usage/timings to its final chunks
     llm_stats = LLMStats()
+    content = ""
+    tool_call = None
     try:
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        tool_call = json.loads(content)
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                if line.startswith(b"data: "):
+                    line = line[6:]
+                if line == b"[DONE]":
+                    break
+                chunk = orjson.loads(line)
+
+                # llama.cpp attaches usage/timings to its final chunks
+                if "usage" in chunk:
+                    llm_stats.prompt_tokens = chunk["usage"].get("prompt_tokens", 0)
+                    llm_stats.completion_tokens = chunk["usage"].get(
+                        "completion_tokens", 0
+                    )
+                if "timings" in chunk:
+                    llm_stats.prompt_ms = chunk["timings"].get("prompt_ms", 0)
+                    llm_stats.completion_ms = chunk["timings"].get("predicted_ms", 0)
+                    llm_stats.tokens_per_sec = chunk["timings"].get(
+                        "predicted_per_second", 0
+                    )
+
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                piece = choices[0].get("delta", {}).get("content")
+                if not piece:
+                    continue
+                content += piece
+                if tool_call is None:
+                    try:
+                        tool_call = orjson.loads(content)
+                    except orjson.JSONDecodeError:
+                        continue
+                # The grammar stops generation at the closing brace, so once
+                # the tool call parses only the final stats chunks remain;
+                # keep draining to [DONE] to pick up usage/timings
+        finally:
+            response.close()
+
         tool_name = tool_call["name"]
         tool_args = tool_call["arguments"]
-
-        # Extract llama.cpp timing stats
-        if "usage" in data:
-            llm_stats.prompt_tokens = data["usage"].get("prompt_tokens", 0)
-            llm_stats.completion_tokens = data["usage"].get("completion_tokens", 0)
-        if "timings" in data:
-            llm_stats.prompt_ms = data["timings"].get("prompt_ms", 0)
-            llm_stats.completion_ms = data["timings"].get("predicted_ms", 0)
-            llm_stats.tokens_per_sec = data["timings"].get("predicted_per_second", 0)
-    except (json.JSONDecodeError, KeyError) as e:
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
         return QueryResult(
             tool_name="",
             tool_args={},
-            result={"raw_response": content if "content" in dir() else str(e)},
+            result={"raw_response": content or str(e)},
             geocoded=geocoded,
             query_time=time.time() - start_time,
             modified_query=modified_query,
@@ -285,8 +405,7 @@ def query(
 
     # Execute spatial tool
     try:
-        result_json = spatial_tools.execute_tool(tool_name, **tool_args)
-        result = json.loads(result_json)
+        result = spatial_tools.execute_tool(tool_name, **tool_args)
     except Exception as e:
         return QueryResult(
             tool_name=tool_name,
@@ -299,7 +418,7 @@ def query(
             error=f"Tool execution failed: {e}",
         )
 
-    return QueryResult(
+    query_result = QueryResult(
         tool_name=tool_name,
         tool_args=tool_args,
         result=result,
@@ -310,12 +429,114 @@ def query(
         success=True,
     )
 
+    # Only successful results are cached; failures should retry
+    _EXACT_CACHE[cache_key] = query_result
+    if len(_EXACT_CACHE) > _EXACT_CACHE_MAX:
+        _EXACT_CACHE.pop(next(iter(_EXACT_CACHE)))
+    return query_result
+
 
 # ============================================================================
 # CLI Formatting
 # ============================================================================
 
 
+def _dumps(obj, pretty: bool = True) -> str:
+    """Pretty-print JSON through orjson; matters for isochrone-sized dicts."""
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    return orjson.dumps(obj, option=option, default=str).decode()
+
+
+def _print_json(obj) -> None:
+    """Write orjson output straight to stdout, skipping the str round trip."""
+    # Flush the text layer first so earlier print()s (loader progress) keep
+    # their order when stdout is a block-buffered pipe
+    sys.stdout.flush()
+    sys.stdout.buffer.write(
+        orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str) + b"\n"
+    )
+    sys.stdout.buffer.flush()
+
+
+# Bound-format templates for the per-row loops: the ANSI codes are baked in
+# once instead of being re-interpolated for every line
+_FMT_GEOCODE = (
+    f"  📍 {C.YELLOW}{{place}}{C.RESET} → "
+    f"{C.DIM}({{lat:.6f}}, {{lon:.6f}}){C.RESET}"
+).format
+_FMT_POI = f"    • {{name}} {C.DIM}({{dist:.0f}}m){C.RESET}".format
+_FMT_POI_WALK = (
+    f"    🚶 {C.BOLD}{{name}}{C.RESET} — {C.CYAN}{{walk:.1f}} min{C.RESET} "
+    f"{C.DIM}({{dist:.0f}}m){C.RESET}"
+).format
+
+
+def _fmt_list_pois(data, tool_args, lines):
+    poi_type = data.get("poi_type", "POI")
+    count = data.get("count", 0)
+    radius = tool_args.get("radius_m", 1000)
+    lines.append(
+        f"  Found {C.BOLD}{C.GREEN}{count}{C.RESET} {poi_type}(s) within {C.CYAN}{radius}m{C.RESET}"
+    )
+    pois = data.get("pois", [])
+    for poi in pois[:6]:
+        lines.append(
+            _FMT_POI(name=poi.get("name", "Unnamed"), dist=poi.get("distance_m", 0))
+        )
+    if len(pois) > 6:
+        lines.append(f"    {C.DIM}... and {len(pois) - 6} more{C.RESET}")
+
+
+def _fmt_nearest_poi(data, tool_args, lines):
+    poi_type = data.get("poi_type", "POI")
+    found = data.get("found", 0)
+    lines.append(f"  Nearest {poi_type}(s): {C.GREEN}{found} found{C.RESET}")
+    for poi in data.get("nearest_pois", [])[:5]:
+        lines.append(
+            _FMT_POI_WALK(
+                name=poi.get("name", "Unnamed"),
+                walk=poi.get("walk_minutes", 0),
+                dist=poi.get("distance_m", 0),
+            )
+        )
+
+
+def _fmt_route(data, tool_args, lines):
+    dist_km = data.get("distance_km", 0)
+    walk_min = data.get("walk_minutes", 0)
+    num_nodes = data.get("num_nodes", 0)
+    lines.append(f"  📏 Distance:   {C.CYAN}{dist_km:.2f} km{C.RESET}")
+    lines.append(f"  🚶 Walk time:  {C.GREEN}{walk_min:.0f} minutes{C.RESET}")
+    lines.append(f"  🔗 Path nodes: {C.DIM}{num_nodes}{C.RESET}")
+
+
+def _fmt_isochrone(data, tool_args, lines):
+    max_min = data.get("max_minutes", 0)
+    reachable = data.get("reachable_nodes", 0)
+    boundary = len(data.get("boundary_points", []))
+    lines.append(f"  ⏱️  Max time:       {C.CYAN}{max_min} minutes{C.RESET}")
+    lines.append(f"  🔗 Reachable nodes: {C.GREEN}{reachable:,}{C.RESET}")
+    lines.append(f"  📐 Boundary points: {C.DIM}{boundary}{C.RESET}")
+
+
+def _fmt_geocode(data, tool_args, lines):
+    place = data.get("place", "Unknown")
+    lat = data.get("lat", 0)
+    lon = data.get("lon", 0)
+    matches = data.get("matches", 0)
+    lines.append(f"  📍 {C.YELLOW}{place}{C.RESET} → ({lat:.6f}, {lon:.6f})")
+    lines.append(f"  🔍 {matches} match(es)")
+
+
+_FORMATTERS = {
+    "list_pois": _fmt_list_pois,
+    "find_nearest_poi_with_route": _fmt_nearest_poi,
+    "calculate_route": _fmt_route,
+    "generate_isochrone": _fmt_isochrone,
+    "geocode_place": _fmt_geocode,
+}
+
+
 def format_result_rich(result: QueryResult, location_info: dict = None) -> str:
     """Format QueryResult with rich terminal output."""
     lines = []
@@ -328,9 +549,7 @@ def format_result_rich(result: QueryResult, location_info: dict = None) -> str:
     if result.geocoded:
         lines.append(f"{C.DIM}GEOCODING{C.RESET}")
         for place, info in result.geocoded.items():
-            lines.append(
-                f"  📍 {C.YELLOW}{place}{C.RESET} → {C.DIM}({info['lat']:.6f}, {info['lon']:.6f}){C.RESET}"
-            )
+            lines.append(_FMT_GEOCODE(place=place, lat=info["lat"], lon=info["lon"]))
         lines.append("")
 
     # LLM TOOL CALL
@@ -348,60 +567,12 @@ def format_result_rich(result: QueryResult, location_info: dict = None) -> str:
 
     if "error" in data:
         lines.append(f"  {C.RED}Error: {data['error']}{C.RESET}")
-
-    elif result.tool_name == "list_pois":
-        poi_type = data.get("poi_type", "POI")
-        count = data.get("count", 0)
-        radius = result.tool_args.get("radius_m", 1000)
-        lines.append(
-            f"  Found {C.BOLD}{C.GREEN}{count}{C.RESET} {poi_type}(s) within {C.CYAN}{radius}m{C.RESET}"
-        )
-        pois = data.get("pois", [])
-        for poi in pois[:6]:
-            name = poi.get("name", "Unnamed")
-            dist = poi.get("distance_m", 0)
-            lines.append(f"    • {name} {C.DIM}({dist:.0f}m){C.RESET}")
-        if len(pois) > 6:
-            lines.append(f"    {C.DIM}... and {len(pois) - 6} more{C.RESET}")
-
-    elif result.tool_name == "find_nearest_poi_with_route":
-        poi_type = data.get("poi_type", "POI")
-        found = data.get("found", 0)
-        lines.append(f"  Nearest {poi_type}(s): {C.GREEN}{found} found{C.RESET}")
-        for poi in data.get("nearest_pois", [])[:5]:
-            name = poi.get("name", "Unnamed")
-            walk = poi.get("walk_minutes", 0)
-            dist = poi.get("distance_m", 0)
-            lines.append(
-                f"    🚶 {C.BOLD}{name}{C.RESET} — {C.CYAN}{walk:.1f} min{C.RESET} {C.DIM}({dist:.0f}m){C.RESET}"
-            )
-
-    elif result.tool_name == "calculate_route":
-        dist_km = data.get("distance_km", 0)
-        walk_min = data.get("walk_minutes", 0)
-        num_nodes = data.get("num_nodes", 0)
-        lines.append(f"  📏 Distance:   {C.CYAN}{dist_km:.2f} km{C.RESET}")
-        lines.append(f"  🚶 Walk time:  {C.GREEN}{walk_min:.0f} minutes{C.RESET}")
-        lines.append(f"  🔗 Path nodes: {C.DIM}{num_nodes}{C.RESET}")
-
-    elif result.tool_name == "generate_isochrone":
-        max_min = data.get("max_minutes", 0)
-        reachable = data.get("reachable_nodes", 0)
-        boundary = len(data.get("boundary_points", []))
-        lines.append(f"  ⏱️  Max time:       {C.CYAN}{max_min} minutes{C.RESET}")
-        lines.append(f"  🔗 Reachable nodes: {C.GREEN}{reachable:,}{C.RESET}")
-        lines.append(f"  📐 Boundary points: {C.DIM}{boundary}{C.RESET}")
-
-    elif result.tool_name == "geocode_place":
-        place = data.get("place", "Unknown")
-        lat = data.get("lat", 0)
-        lon = data.get("lon", 0)
-        matches = data.get("matches", 0)
-        lines.append(f"  📍 {C.YELLOW}{place}{C.RESET} → ({lat:.6f}, {lon:.6f})")
-        lines.append(f"  🔍 {matches} match(es)")
-
     else:
-        lines.append(f"  {json.dumps(data, indent=2)}")
+        fmt = _FORMATTERS.get(result.tool_name)
+        if fmt is not None:
+            fmt(data, result.tool_args, lines)
+        else:
+            lines.append(f"  {_dumps(data)}")
 
     lines.append("")
 
@@ -512,6 +683,14 @@ Examples:
 
     args = parser.parse_args()
 
+    # Open the socket to llama-server in the background while the config
+    # scan and location load run; the session pool hands the warm connection
+    # to the query's POST
+    if args.query:
+        threading.Thread(
+            target=check_llm_server, args=(args.llm_url,), daemon=True
+        ).start()
+
     # List locations
     if args.list:
         locations = list_locations()
@@ -531,7 +710,7 @@ Examples:
     if args.health:
         health = health_check()
         if args.json:
-            print(json.dumps(health, indent=2))
+            _print_json(health)
         else:
             llm_status = (
                 f"{C.GREEN}✓ Online{C.RESET}"
@@ -568,18 +747,22 @@ Examples:
     # Execute query
     result = query(args.query, location=location, llm_url=args.llm_url)
 
-    # Output
+    # Output: assemble everything and issue one write; rich output plus a
+    # verbose isochrone dump can be tens of KB otherwise split across prints
     if args.json:
-        print(json.dumps(result.to_dict(), indent=2))
-    elif args.simple:
-        print(format_result_simple(result))
+        _print_json(result.to_dict())
     else:
-        print()
-        print(format_result_rich(result, location_info))
+        if args.simple:
+            out = format_result_simple(result)
+        else:
+            out = "\n" + format_result_rich(result, location_info)
+
+        if args.verbose:
+            out += f"\n\n{C.DIM}Raw JSON:{C.RESET}\n{_dumps(result.result)}"
 
-    if args.verbose and not args.json:
-        print(f"\n{C.DIM}Raw JSON:{C.RESET}")
-        print(json.dumps(result.result, indent=2))
+        sys.stdout.flush()  # keep loader print()s ahead of the direct write
+        sys.stdout.buffer.write(out.encode() + b"\n")
+        sys.stdout.buffer.flush()
 
     sys.exit(0 if result.success else 1)
 
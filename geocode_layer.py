@@ -15,6 +15,7 @@ from pathlib import Path
 con = None
 current_location = None
 known_places = {}  # name_lower -> {name, lat, lon, place_type}
+_fallback_cache = {}  # (slug, name_lower) -> centroid dict or None
 
 # ============================================================================
 # Location Loading
@@ -59,20 +60,30 @@ def _load_known_places():
         print("  ⚠️ No places table found - geocoding will use POI fallback")
         return
 
-    results = con.execute(
+    # Columnar fetch instead of one Python tuple per row; .tolist() also
+    # converts the numpy scalars to plain floats up front
+    cols = con.execute(
         """
-        SELECT name, name_lower, lat, lon, place_type 
+        SELECT name, name_lower, lat, lon, place_type
         FROM places
     """
-    ).fetchall()
+    ).fetchnumpy()
 
-    for name, name_lower, lat, lon, place_type in results:
-        known_places[name_lower] = {
+    known_places = {
+        name_lower: {
             "name": name,
             "lat": lat,
             "lon": lon,
             "place_type": place_type,
         }
+        for name, name_lower, lat, lon, place_type in zip(
+            cols["name"].tolist(),
+            cols["name_lower"].tolist(),
+            cols["lat"].tolist(),
+            cols["lon"].tolist(),
+            cols["place_type"].tolist(),
+        )
+    }
 
     print(f"  ✓ Loaded {len(known_places):,} place names for geocoding")
 
@@ -121,10 +132,15 @@ def get_place_centroid_fallback(place_name: str) -> dict | None:
     """
     Fallback: search POI names if place not in known places.
     Used for landmarks, specific buildings, etc.
+    Results are memoized per (location, name) since the lookup is deterministic.
     """
     if con is None:
         return None
 
+    cache_key = (current_location, place_name.lower())
+    if cache_key in _fallback_cache:
+        return _fallback_cache[cache_key]
+
     results = con.execute(
         """
         SELECT lat, lon, name FROM osm_features
@@ -135,19 +151,22 @@ def get_place_centroid_fallback(place_name: str) -> dict | None:
     ).fetchall()
 
     if len(results) < 1:
+        _fallback_cache[cache_key] = None
         return None
 
     # Return centroid of matches
     lats = [r[0] for r in results]
     lons = [r[1] for r in results]
 
-    return {
+    centroid = {
         "name": place_name,
         "lat": sum(lats) / len(lats),
         "lon": sum(lons) / len(lons),
         "place_type": "poi",
         "matches": len(results),
     }
+    _fallback_cache[cache_key] = centroid
+    return centroid
 
 
 def geocode_query(query: str) -> tuple[str, dict]:
@@ -7,8 +7,10 @@ Multi-location support: load_location("dhaka") loads data/dhaka/*
 import networkit as nk
 import duckdb
 import json
+import numpy as np
 from pathlib import Path
-from math import sqrt, cos, radians
+from math import cos, radians
+from scipy.spatial import cKDTree
 
 # ============================================================================
 # Global State (populated by load_location)
@@ -19,6 +21,12 @@ reverse_mapping = {}
 con = None
 current_location = None
 
+# Nearest-node index (built by load_location)
+_node_tree = None
+_node_ids = None
+_node_latlon = None
+_cos_lat = 1.0
+
 # ============================================================================
 # Location Loading
 # ============================================================================
@@ -61,11 +69,23 @@ def load_location(slug: str):
     G_nk = nk.graphio.readGraph(str(graph_path), nk.Format.NetworkitBinary)
     print(f"  ✓ Graph: {G_nk.numberOfNodes():,} nodes, {G_nk.numberOfEdges():,} edges")
 
-    mappings_path = base_path / f"{slug}_mappings.json"
-    with open(mappings_path, "r") as f:
-        mappings = json.load(f)
-        node_mapping = {int(k): v for k, v in mappings["nx_to_nk"].items()}
-        reverse_mapping = {int(k): v for k, v in mappings["nk_to_nx"].items()}
+    parquet_path = base_path / f"{slug}_mappings.parquet"
+    if parquet_path.exists():
+        # Columnar read; both mappings come from the same two columns
+        cols = duckdb.execute(
+            "SELECT nx_id, nk_id FROM read_parquet(?)", [str(parquet_path)]
+        ).fetchnumpy()
+        nx_ids = cols["nx_id"].tolist()
+        nk_ids = cols["nk_id"].tolist()
+        node_mapping = dict(zip(nx_ids, nk_ids))
+        reverse_mapping = dict(zip(nk_ids, nx_ids))
+    else:
+        # Locations built before the Parquet switch
+        mappings_path = base_path / f"{slug}_mappings.json"
+        with open(mappings_path, "r") as f:
+            mappings = json.load(f)
+            node_mapping = {int(k): v for k, v in mappings["nx_to_nk"].items()}
+            reverse_mapping = {int(k): v for k, v in mappings["nk_to_nx"].items()}
 
     db_path = base_path / f"{slug}.duckdb"
     if con is not None:
@@ -77,10 +97,31 @@ def load_location(slug: str):
     poi_count = con.execute("SELECT COUNT(*) FROM osm_features").fetchone()[0]
     print(f"  ✓ Database: {poi_count:,} POIs")
 
+    _build_node_index()
+
     current_location = slug
     print(f"  ✓ Ready: {slug}")
 
 
+def _build_node_index():
+    """Build a KD-tree over graph nodes for O(log n) nearest-node lookups."""
+    global _node_tree, _node_ids, _node_latlon, _cos_lat
+
+    _node_tree = None
+    try:
+        cols = con.execute("SELECT node_id, lat, lon FROM nodes").fetchnumpy()
+        lats = np.asarray(cols["lat"], dtype=np.float64)
+        lons = np.asarray(cols["lon"], dtype=np.float64)
+        _node_ids = cols["node_id"]
+        _node_latlon = np.column_stack((lats, lons))
+        # Equirectangular projection is fine at metro scale
+        _cos_lat = cos(radians(float(lats.mean())))
+        _node_tree = cKDTree(np.column_stack((lats, lons * _cos_lat)))
+        print(f"  ✓ Node index: {len(lats):,} nodes")
+    except:
+        print("  ⚠️ Node index unavailable - falling back to SQL nearest-node")
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
@@ -88,6 +129,14 @@ def load_location(slug: str):
 
 def find_nearest_node(lat: float, lon: float) -> tuple:
     """Find nearest graph node to a lat/lon point."""
+    if _node_tree is not None:
+        _, idx = _node_tree.query([lat, lon * _cos_lat])
+        return (
+            int(_node_ids[idx]),
+            float(_node_latlon[idx, 0]),
+            float(_node_latlon[idx, 1]),
+        )
+
     result = con.execute(
         """
         SELECT node_id, lat, lon
@@ -136,43 +185,50 @@ def _extract_path_coords(path_nk: list, sample_size: int = 100) -> list:
 # ============================================================================
 
 
-def list_pois(poi_type: str, lat: float, lon: float, radius_m: int = 1000) -> str:
+def list_pois(poi_type: str, lat: float, lon: float, radius_m: int = 1000) -> dict:
     """List POIs of a given type within radius, with total count."""
-    total = con.execute(
-        """
-        SELECT COUNT(*)
-        FROM osm_features
-        WHERE tag_value = ?
-          AND ST_Distance(geom, ST_Point(?, ?)) * 111000 < ?
-    """,
-        [poi_type, lon, lat, radius_m],
-    ).fetchone()[0]
-
+    # Cheap lat/lon bbox prefilter so ST_Distance only runs on nearby rows,
+    # and COUNT(*) OVER () folds the total into the same scan
+    buffer_deg = radius_m / 111000
     results = con.execute(
         """
         SELECT name, lat, lon,
-               ST_Distance(geom, ST_Point(?, ?)) * 111000 as distance_m
+               ST_Distance(geom, ST_Point(?, ?)) * 111000 as distance_m,
+               COUNT(*) OVER () as total
         FROM osm_features
         WHERE tag_value = ?
+          AND lat BETWEEN ? AND ?
+          AND lon BETWEEN ? AND ?
           AND ST_Distance(geom, ST_Point(?, ?)) * 111000 < ?
         ORDER BY distance_m
         LIMIT 50
     """,
-        [lon, lat, poi_type, lon, lat, radius_m],
+        [
+            lon,
+            lat,
+            poi_type,
+            lat - buffer_deg,
+            lat + buffer_deg,
+            lon - buffer_deg,
+            lon + buffer_deg,
+            lon,
+            lat,
+            radius_m,
+        ],
     ).fetchall()
 
-    return json.dumps(
-        {
-            "poi_type": poi_type,
-            "count": total,
-            "radius_m": radius_m,
-            "center": {"lat": lat, "lon": lon},
-            "pois": [
-                {"name": r[0], "lat": r[1], "lon": r[2], "distance_m": r[3]}
-                for r in results
-            ],
-        }
-    )
+    total = results[0][4] if results else 0
+
+    return {
+        "poi_type": poi_type,
+        "count": total,
+        "radius_m": radius_m,
+        "center": {"lat": lat, "lon": lon},
+        "pois": [
+            {"name": r[0], "lat": r[1], "lon": r[2], "distance_m": r[3]}
+            for r in results
+        ],
+    }
 
 
 def find_nearest_poi_with_route(
@@ -182,22 +238,37 @@ def find_nearest_poi_with_route(
     limit: int = 3,
     distance: int = None,
     radius_m: int = None,
-) -> str:
+) -> dict:
     """Find nearest POIs and calculate walking routes to each, including path to nearest."""
     search_radius = distance or radius_m
 
     if search_radius:
+        buffer_deg = search_radius / 111000
         pois = con.execute(
             """
             SELECT name, lat, lon
             FROM osm_features
             WHERE tag_value = ?
               AND name IS NOT NULL
+              AND lat BETWEEN ? AND ?
+              AND lon BETWEEN ? AND ?
               AND ST_Distance(geom, ST_Point(?, ?)) * 111000 < ?
             ORDER BY ST_Distance(geom, ST_Point(?, ?))
             LIMIT ?
         """,
-            [poi_type, lon, lat, search_radius, lon, lat, limit],
+            [
+                poi_type,
+                lat - buffer_deg,
+                lat + buffer_deg,
+                lon - buffer_deg,
+                lon + buffer_deg,
+                lon,
+                lat,
+                search_radius,
+                lon,
+                lat,
+                limit,
+            ],
         ).fetchall()
     else:
         pois = con.execute(
@@ -213,7 +284,7 @@ def find_nearest_poi_with_route(
         ).fetchall()
 
     if not pois:
-        return json.dumps({"poi_type": poi_type, "found": 0, "nearest_pois": []})
+        return {"poi_type": poi_type, "found": 0, "nearest_pois": []}
 
     start_node = find_nearest_node(lat, lon)
     start_nk = node_mapping.get(start_node[0])
@@ -254,20 +325,18 @@ def find_nearest_poi_with_route(
 
     results.sort(key=lambda x: x["walk_minutes"])
 
-    return json.dumps(
-        {
-            "poi_type": poi_type,
-            "found": len(results),
-            "nearest_pois": results,
-            "path": nearest_path,  # Path to nearest POI
-            "start": {"lat": lat, "lon": lon},
-        }
-    )
+    return {
+        "poi_type": poi_type,
+        "found": len(results),
+        "nearest_pois": results,
+        "path": nearest_path,  # Path to nearest POI
+        "start": {"lat": lat, "lon": lon},
+    }
 
 
 def calculate_route(
     start_lat: float, start_lon: float, end_lat: float, end_lon: float
-) -> str:
+) -> dict:
     """Calculate walking route between two points."""
     start_node = find_nearest_node(start_lat, start_lon)
     end_node = find_nearest_node(end_lat, end_lon)
@@ -276,26 +345,24 @@ def calculate_route(
     end_nk = node_mapping.get(end_node[0])
 
     if start_nk is None or end_nk is None:
-        return json.dumps({"error": "Could not find route nodes"})
+        return {"error": "Could not find route nodes"}
 
     dijkstra = nk.distance.Dijkstra(G_nk, start_nk, True, True, end_nk)
     dijkstra.run()
 
     distance_m = dijkstra.distance(end_nk)
     if distance_m == float("inf"):
-        return json.dumps({"error": "No route found"})
+        return {"error": "No route found"}
 
     path_nk = dijkstra.getPath(end_nk)
     path_coords = _extract_path_coords(path_nk)
 
-    return json.dumps(
-        {
-            "distance_km": round(distance_m / 1000, 2),
-            "walk_minutes": round(distance_m / 83.33, 0),
-            "num_nodes": len(path_nk),
-            "path": path_coords,
-        }
-    )
+    return {
+        "distance_km": round(distance_m / 1000, 2),
+        "walk_minutes": round(distance_m / 83.33, 0),
+        "num_nodes": len(path_nk),
+        "path": path_coords,
+    }
 
 
 def find_along_route(
@@ -305,7 +372,7 @@ def find_along_route(
     end_lon: float,
     poi_type: str = None,
     buffer_m: int = 100,
-) -> str:
+) -> dict:
     """Find POIs along a walking route between two points."""
     start_node = find_nearest_node(start_lat, start_lon)
     end_node = find_nearest_node(end_lat, end_lon)
@@ -314,14 +381,14 @@ def find_along_route(
     end_nk = node_mapping.get(end_node[0])
 
     if start_nk is None or end_nk is None:
-        return json.dumps({"error": "Could not find route nodes"})
+        return {"error": "Could not find route nodes"}
 
     dijkstra = nk.distance.Dijkstra(G_nk, start_nk, True, True, end_nk)
     dijkstra.run()
 
     distance_m = dijkstra.distance(end_nk)
     if distance_m == float("inf"):
-        return json.dumps({"error": "No route found"})
+        return {"error": "No route found"}
 
     path_nk = dijkstra.getPath(end_nk)
 
@@ -337,7 +404,7 @@ def find_along_route(
                 path_coords.append((node_data[0], node_data[1]))
 
     if len(path_coords) < 2:
-        return json.dumps({"error": "Route too short"})
+        return {"error": "Route too short"}
 
     # Sample path for efficient distance calculations
     sample_step = max(1, len(path_coords) // 40)
@@ -371,42 +438,32 @@ def find_along_route(
         params,
     ).fetchall()
 
-    # Filter to POIs within buffer
+    # Filter to POIs within buffer: one (candidates x samples) equirectangular
+    # distance matrix in NumPy instead of nested Python loops
     mid_lat = (min_lat + max_lat) / 2
     cos_lat = cos(radians(mid_lat))
 
-    def min_distance_to_route(poi_lat, poi_lon):
-        min_dist = float("inf")
-        for lat, lon in sampled:
-            dlat = (poi_lat - lat) * 111000
-            dlon = (poi_lon - lon) * 111000 * cos_lat
-            dist = sqrt(dlat * dlat + dlon * dlon)
-            if dist < min_dist:
-                min_dist = dist
-        return min_dist
-
-    def distance_along_route(poi_lat, poi_lon):
-        best_idx, best_dist = 0, float("inf")
-        for i, (lat, lon) in enumerate(sampled):
-            dlat = (poi_lat - lat) * 111000
-            dlon = (poi_lon - lon) * 111000 * cos_lat
-            dist = sqrt(dlat * dlat + dlon * dlon)
-            if dist < best_dist:
-                best_idx, best_dist = i, dist
-        return best_idx
-
     pois_along = []
-    for name, lat, lon, tag_key, tag_value in candidates:
-        dist = min_distance_to_route(lat, lon)
-        if dist <= buffer_m:
+    if candidates:
+        samp = np.asarray(sampled, dtype=np.float64)
+        cand = np.array([(c[1], c[2]) for c in candidates], dtype=np.float64)
+        dlat = (cand[:, 0, None] - samp[None, :, 0]) * 111000
+        dlon = (cand[:, 1, None] - samp[None, :, 1]) * 111000 * cos_lat
+        dists = np.sqrt(dlat * dlat + dlon * dlon)
+        off_route = dists.min(axis=1)
+        # Index of the nearest path sample doubles as order along the route
+        order = dists.argmin(axis=1)
+
+        for i in np.flatnonzero(off_route <= buffer_m):
+            name, poi_lat, poi_lon, tag_key, tag_value = candidates[i]
             pois_along.append(
                 {
                     "name": name,
-                    "lat": lat,
-                    "lon": lon,
+                    "lat": poi_lat,
+                    "lon": poi_lon,
                     "type": tag_value,
-                    "off_route_m": round(dist, 1),
-                    "_order": distance_along_route(lat, lon),
+                    "off_route_m": round(float(off_route[i]), 1),
+                    "_order": int(order[i]),
                 }
             )
 
@@ -417,68 +474,69 @@ def find_along_route(
     # Sample path for visualization
     vis_path = _extract_path_coords(path_nk)
 
-    return json.dumps(
-        {
-            "distance_km": round(distance_m / 1000, 2),
-            "walk_minutes": round(distance_m / 83.33, 0),
-            "buffer_m": buffer_m,
-            "poi_type": poi_type,
-            "pois_found": len(pois_along),
-            "pois": pois_along[:15],
-            "path": vis_path,
-        }
-    )
+    return {
+        "distance_km": round(distance_m / 1000, 2),
+        "walk_minutes": round(distance_m / 83.33, 0),
+        "buffer_m": buffer_m,
+        "poi_type": poi_type,
+        "pois_found": len(pois_along),
+        "pois": pois_along[:15],
+        "path": vis_path,
+    }
 
 
-def generate_isochrone(lat: float, lon: float, max_minutes: int = 15) -> str:
+def generate_isochrone(lat: float, lon: float, max_minutes: int = 15) -> dict:
     """Generate walkable area from a point."""
     start_node = find_nearest_node(lat, lon)
     start_nk = node_mapping.get(start_node[0])
 
     if start_nk is None:
-        return json.dumps({"error": "Could not find start node"})
+        return {"error": "Could not find start node"}
 
     max_distance = max_minutes * 83.33
 
     dijkstra = nk.distance.Dijkstra(G_nk, start_nk, True, False)
     dijkstra.run()
 
+    # Pull all node distances out of NetworKit in one call and filter the
+    # boundary band in NumPy instead of a per-node Python loop
+    dists = np.asarray(dijkstra.getDistances(), dtype=np.float64)
+    within = dists <= max_distance
+    reachable = int(within.sum())
+    band = np.flatnonzero(within & (dists > max_distance * 0.8))
+
     boundary_points = []
-    reachable = 0
-
-    for nk_id in range(G_nk.numberOfNodes()):
-        dist = dijkstra.distance(nk_id)
-        if dist <= max_distance:
-            reachable += 1
-            if dist > max_distance * 0.8:
-                nx_id = reverse_mapping.get(nk_id)
-                if nx_id:
-                    node_data = con.execute(
-                        "SELECT lat, lon FROM nodes WHERE node_id = ?", [nx_id]
-                    ).fetchone()
-                    if node_data:
-                        boundary_points.append(
-                            {
-                                "lat": node_data[0],
-                                "lon": node_data[1],
-                                "walk_minutes": round(dist / 83.33, 1),
-                            }
-                        )
+    if band.size:
+        nx_ids = [reverse_mapping.get(int(nk_id)) for nk_id in band]
+        # One coordinate fetch for the whole band instead of a query per node
+        rows = con.execute(
+            "SELECT node_id, lat, lon FROM nodes WHERE node_id IN (SELECT UNNEST(?))",
+            [[nx_id for nx_id in nx_ids if nx_id]],
+        ).fetchall()
+        coords = {r[0]: (r[1], r[2]) for r in rows}
+        for nk_id, nx_id in zip(band, nx_ids):
+            coord = coords.get(nx_id)
+            if coord:
+                boundary_points.append(
+                    {
+                        "lat": coord[0],
+                        "lon": coord[1],
+                        "walk_minutes": round(float(dists[nk_id]) / 83.33, 1),
+                    }
+                )
 
     if len(boundary_points) > 100:
         step = len(boundary_points) // 100
         boundary_points = boundary_points[::step]
 
-    return json.dumps(
-        {
-            "max_minutes": max_minutes,
-            "reachable_nodes": reachable,
-            "boundary_points": boundary_points,
-        }
-    )
+    return {
+        "max_minutes": max_minutes,
+        "reachable_nodes": reachable,
+        "boundary_points": boundary_points,
+    }
 
 
-def geocode_place(place_name: str) -> str:
+def geocode_place(place_name: str) -> dict:
     """Get coordinates for a place name."""
     results = con.execute(
         """
@@ -491,19 +549,17 @@ def geocode_place(place_name: str) -> str:
     ).fetchall()
 
     if not results:
-        return json.dumps({"error": f"Place not found: {place_name}"})
+        return {"error": f"Place not found: {place_name}"}
 
     lats = [r[0] for r in results]
     lons = [r[1] for r in results]
 
-    return json.dumps(
-        {
-            "place": place_name,
-            "lat": sum(lats) / len(lats),
-            "lon": sum(lons) / len(lons),
-            "matches": len(results),
-        }
-    )
+    return {
+        "place": place_name,
+        "lat": sum(lats) / len(lats),
+        "lon": sum(lons) / len(lons),
+        "matches": len(results),
+    }
 
 
 # ============================================================================
@@ -520,12 +576,12 @@ TOOLS = {
 }
 
 
-def execute_tool(tool_name: str, **kwargs) -> str:
+def execute_tool(tool_name: str, **kwargs) -> dict:
     """Execute a tool by name with given arguments."""
     if tool_name not in TOOLS:
-        return json.dumps({"error": f"Unknown tool: {tool_name}"})
+        return {"error": f"Unknown tool: {tool_name}"}
 
     try:
         return TOOLS[tool_name](**kwargs)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}